@@ -1,6 +1,9 @@
-from typing import Any, List, Tuple
+from typing import Any, List, Sequence, Tuple
+import atexit
+import itertools
+import logging
 import time
-import uuid
+import weakref
 
 from snapperable.storage.snapshot_storage import SnapshotStorage
 from snapperable.batch_storage_worker import BatchStorageWorker
@@ -13,12 +16,31 @@ class BatchProcessor:
     Handles batching of items and delegates processing to a storage backend.
     """
 
+    __slots__ = (
+        "storage_backend",
+        "batch_size",
+        "max_wait_time",
+        "_inputs",
+        "_outputs",
+        "_count",
+        "_batch_metrics",
+        "_pending",
+        "_max_wait_ns",
+        "_deadline_ns",
+        "_batch_ids",
+        "_storage_worker",
+        "__weakref__",
+    )
+
     def __init__(
         self,
         storage_backend: SnapshotStorage[Any],
         batch_size: int,
         max_wait_time: float | None = None,
         max_retries: int = 3,
+        max_coalesce: int = 1,
+        max_coalesce_items: int = 4096,
+        max_pending_batches: int = 64,
     ):
         """
         Initialize the BatchProcessor.
@@ -26,22 +48,60 @@ class BatchProcessor:
         Args:
             storage_backend: The storage backend to delegate processing to.
             batch_size: The number of items to batch before processing.
-            max_wait_time: The maximum time to wait before processing a batch. If None, no time limit is enforced.
+            max_wait_time: The maximum time the first item of a batch waits before the batch is processed.
+                If None, no time limit is enforced.
             max_retries: Maximum number of retry attempts for failed storage operations. Default is 3.
+            max_coalesce: Maximum number of queued batches the background worker merges into
+                a single storage write when saving falls behind. Default is 1 (no merging).
+            max_coalesce_items: Maximum number of items in a merged storage write. Default is 4096.
+            max_pending_batches: Maximum number of flushed batches waiting to be saved. Flushing
+                blocks while this many are pending. Default is 64; zero or less means unbounded.
         """
         self.storage_backend = storage_backend
         self.batch_size = batch_size
         self.max_wait_time = max_wait_time
-        self.current_batch: List[
-            Tuple[Any, Any, ProcessingMetric | None]
-        ] = []  # List of (input, output, metric) tuples
-        self.last_flush_time = None
+        # Pre-allocated parallel slots for inputs and outputs, filled up to
+        # self._count. Keeping them in separate lists lets flush() hand slices
+        # to the storage worker without unpacking tuples. The slots are reused
+        # across batches and cleared by each flush.
+        slots = max(batch_size, 1)
+        self._inputs: List[Any] = [None] * slots
+        self._outputs: List[Any] = [None] * slots
+        self._count = 0
+        # Metrics of the current batch, successful and failed items alike, in
+        # the order the items were processed
+        self._batch_metrics: List[ProcessingMetric] = []
+        # Number of pending entries (items and failed metrics) in the batch
+        self._pending = 0
+        # Wait limit and next flush deadline in monotonic nanoseconds, so the
+        # per-item check is a single integer comparison. -1 means no deadline.
+        self._max_wait_ns = (
+            None if max_wait_time is None else int(max_wait_time * 1_000_000_000)
+        )
+        self._deadline_ns = -1
+        # Sequential batch ids for tracing batches in logs
+        self._batch_ids = itertools.count(1)
 
         # Delegate background storage to BatchStorageWorker
         self._storage_worker = BatchStorageWorker(
-            storage_backend, max_retries=max_retries
+            storage_backend,
+            max_retries=max_retries,
+            max_coalesce=max_coalesce,
+            max_coalesce_items=max_coalesce_items,
+            max_pending_batches=max_pending_batches,
         )
 
+        # Save a partial batch if the interpreter exits before shutdown() is called.
+        # The set holds weak references, so a processor that is garbage-collected
+        # without being shut down leaves nothing behind.
+        _live_processors.add(self)
+
+    @property
+    def current_batch(self) -> List[Tuple[Any, Any]]:
+        """The (input, output) tuples waiting to be flushed."""
+        count = self._count
+        return list(zip(self._inputs[:count], self._outputs[:count]))
+
     def add_item(
         self, item: Any, input_value: Any, metric: ProcessingMetric | None = None
     ) -> None:
@@ -54,69 +114,150 @@ class BatchProcessor:
             input_value: The corresponding input value for input-based tracking.
             metric: Optional ProcessingMetric for this item.
         """
-        logger.debug(
-            "Adding item to batch: input_value=%s, output_value=%s", input_value, item
-        )
-        should_flush = False
-        self.current_batch.append((input_value, item, metric))
-        logger.debug("Current batch size: %d", len(self.current_batch))
+        count = self._count
+        self._inputs[count] = input_value
+        self._outputs[count] = item
+        if metric is not None:
+            self._batch_metrics.append(metric)
+        self._count = count + 1
+        self._pending += 1
+        # Checked per call so that enabling debug logging at runtime takes effect
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Added item to batch: input_value=%s, output_value=%s, batch size: %d",
+                input_value,
+                item,
+                self._count,
+            )
+        self._flush_if_needed()
 
-        # Initialize last flush time if it's the first item
-        if self.last_flush_time is None:
-            self._update_last_flush_time()
+    def add_items(
+        self,
+        items: Sequence[Any],
+        input_values: Sequence[Any],
+        metrics: Sequence[ProcessingMetric | None] | None = None,
+    ) -> None:
+        """
+        Add several items to the current batch at once. Full batches are flushed as
+        they fill up; the remainder stays in the current batch.
 
-        if self._is_wait_time_exceeded():
-            logger.debug("Wait time exceeded. Triggering flush.")
-            should_flush = True
+        Args:
+            items: The output items to be added to the batch.
+            input_values: The corresponding input values, in the same order as items.
+            metrics: Optional ProcessingMetric for each item, in the same order as items.
 
-        if self._is_batch_full():
-            logger.debug("Batch is full. Triggering flush.")
-            should_flush = True
+        Raises:
+            ValueError: If items, input_values and metrics differ in length.
+        """
+        if metrics is None:
+            metrics = [None] * len(items)
+        if not len(items) == len(input_values) == len(metrics):
+            raise ValueError("items, input_values and metrics must have the same length")
 
-        if should_flush:
-            self.flush()
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Adding %d items to batch", len(items))
+        start = 0
+        while start < len(items):
+            # Fill the free slots of the current batch with slice assignments
+            room = max(self.batch_size - self._pending, 1)
+            end = min(start + room, len(items))
+            count = self._count
+            new_count = count + end - start
+            self._inputs[count:new_count] = input_values[start:end]
+            self._outputs[count:new_count] = items[start:end]
+            self._batch_metrics.extend(m for m in metrics[start:end] if m is not None)
+            self._count = new_count
+            self._pending += end - start
+            start = end
+            self._flush_if_needed()
 
     def flush(self) -> None:
         """
         Flush the current batch by enqueueing it for background saving. Clears the batch.
         """
-        batch_id = str(uuid.uuid4())[:8]
-        logger.debug("Flushing current batch (batch_id=%s).", batch_id)
-        batch_to_store = None
-        if self.current_batch:
-            batch_to_store = self.current_batch
-            self.current_batch = []
+        if not self._pending:
+            # Nothing to save, e.g. the final flush after a full batch
+            return
+
+        batch_id = str(next(self._batch_ids))
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug("Flushing current batch (batch_id=%s).", batch_id)
+        count = self._count
+        self._count = 0
+        if count and debug:
             logger.debug("Batch cleared after flush (batch_id=%s).", batch_id)
 
-        if batch_to_store:
-            # Separate inputs, outputs, and metrics
-            inputs = [inp for inp, _, _ in batch_to_store]
-            outputs = [out for _, out, _ in batch_to_store]
-            metrics = [m for _, _, m in batch_to_store if m is not None]
+        metrics = self._batch_metrics
+        if metrics:
+            self._batch_metrics = []
+
+        if count:
+            inputs = self._inputs[:count]
+            outputs = self._outputs[:count]
+            # Drop the references held by the slots, so a flushed batch is freed
+            # once it has been saved
+            self._inputs[:count] = self._outputs[:count] = [None] * count
 
             # Delegate to storage worker for background saving
             self._storage_worker.enqueue_batch(outputs, inputs, batch_id, metrics)
-            self._update_last_flush_time()
+        elif metrics:
+            self._storage_worker.enqueue_metrics_only(metrics, batch_id)
+
+        self._pending = 0
+        # The next batch starts its own wait-time clock with its first item
+        self._deadline_ns = -1
 
     def add_failed_metric(self, metric: ProcessingMetric) -> None:
         """
-        Immediately enqueue a failed-item metric for background storage.
+        Add a failed-item metric to the current batch.
 
-        This method is used when an item fails processing (skip_item_errors=True)
-        to persist the failure metric without waiting until the end of the run.
+        This method is used when an item fails processing (skip_item_errors=True).
+        A failed item counts towards the batch size, so its metric is persisted on
+        the same cadence as successful items rather than with a write of its own.
 
         Args:
             metric: The ProcessingMetric for the failed item.
         """
-        batch_id = str(uuid.uuid4())[:8]
-        self._storage_worker.enqueue_metrics_only([metric], batch_id)
+        self._batch_metrics.append(metric)
+        self._pending += 1
+        self._flush_if_needed()
 
-    def shutdown(self) -> None:
+    def shutdown(self, flush: bool = False) -> None:
         """
         Gracefully shutdown the background worker thread.
         Waits for all queued items to be processed before stopping.
+
+        Args:
+            flush: If True, the current batch is flushed before shutting down, so
+                items that have not been flushed yet are saved as well.
         """
-        self._storage_worker.shutdown()
+        _live_processors.discard(self)
+        try:
+            if flush:
+                self.flush()
+        finally:
+            self._storage_worker.shutdown()
+
+    def _flush_if_needed(self) -> None:
+        """
+        Flush the current batch if it is full or the maximum wait time is exceeded.
+        """
+        # Arm the deadline only when the first item enters an empty batch, so an
+        # idle period between batches does not force an immediate flush
+        if self._max_wait_ns is not None and self._deadline_ns == -1:
+            self._reset_deadline()
+
+        # Failed-item metrics count towards the batch size. A full batch is
+        # flushed without reading the clock.
+        if self._pending >= self.batch_size:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Batch is full. Triggering flush.")
+            self.flush()
+        elif self._is_wait_time_exceeded():
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Wait time exceeded. Triggering flush.")
+            self.flush()
 
     def _is_wait_time_exceeded(self) -> bool:
         """
@@ -125,27 +266,27 @@ class BatchProcessor:
         Returns:
             True if the wait time has been exceeded, False otherwise.
         """
-        if self.max_wait_time is None:
-            return False
-
-        if self.last_flush_time is None:
-            return False
-
-        # Check if the last item addition was beyond the max wait time threshold
-        current_time = time.time()
-        return (current_time - self.last_flush_time) > self.max_wait_time
+        return self._deadline_ns != -1 and time.monotonic_ns() > self._deadline_ns
 
-    def _update_last_flush_time(self) -> None:
+    def _reset_deadline(self) -> None:
         """
-        Update the last flush time to the current time.
+        Set the next flush deadline to max_wait_time from now.
         """
-        self.last_flush_time = time.time()
+        if self._max_wait_ns is not None:
+            self._deadline_ns = time.monotonic_ns() + self._max_wait_ns
 
-    def _is_batch_full(self) -> bool:
-        """
-        Check if the current batch is full.
 
-        Returns:
-            True if the batch size has been reached, False otherwise.
-        """
-        return len(self.current_batch) >= self.batch_size
+def _shutdown_at_exit() -> None:
+    """
+    Flush and shut down the BatchProcessors that are still running at interpreter exit.
+    """
+    for processor in list(_live_processors):
+        try:
+            processor.shutdown(flush=True)
+        except Exception as e:
+            logger.error("Failed to save pending batch at exit: %s", e)
+
+
+# BatchProcessors that have not been shut down yet
+_live_processors: "weakref.WeakSet[BatchProcessor]" = weakref.WeakSet()
+atexit.register(_shutdown_at_exit)
@@ -1,6 +1,7 @@
 """Background worker for asynchronous batch storage."""
 
 from typing import Any, List, Optional
+import logging
 import queue
 import threading
 
@@ -18,7 +19,26 @@ class BatchStorageWorker:
     loop to continue without blocking on I/O.
     """
 
-    def __init__(self, storage_backend: SnapshotStorage[Any], max_retries: int = 3):
+    __slots__ = (
+        "storage_backend",
+        "max_retries",
+        "max_coalesce",
+        "max_coalesce_items",
+        "_save_queue",
+        "_worker_thread",
+        "_shutdown",
+        "_shutdown_lock",
+        "_failed_exception",
+    )
+
+    def __init__(
+        self,
+        storage_backend: SnapshotStorage[Any],
+        max_retries: int = 3,
+        max_coalesce: int = 1,
+        max_coalesce_items: int = 4096,
+        max_pending_batches: int = 64,
+    ):
         """
         Initialize the BatchStorageWorker.
 
@@ -26,17 +46,28 @@ class BatchStorageWorker:
             storage_backend: The storage backend to delegate saving to.
             max_retries: Maximum number of retry attempts for failed storage operations.
                         Default is 3. If all retries fail, the exception is raised during shutdown.
+            max_coalesce: Maximum number of queued entries merged into a single storage
+                        write when the worker falls behind. Default is 1 (no merging).
+            max_coalesce_items: No more queued entries are merged once the merged write holds
+                        this many items. Default is 4096.
+            max_pending_batches: Maximum number of entries waiting to be saved. When the
+                        queue is full, enqueueing blocks until the worker catches up, so a
+                        slow storage backend cannot make memory grow without bound.
+                        Default is 64. Zero or less means unbounded.
         """
         self.storage_backend = storage_backend
         self.max_retries = max_retries
+        self.max_coalesce = max(max_coalesce, 1)
+        self.max_coalesce_items = max_coalesce_items
         # Queue items are (outputs, inputs, batch_id, metrics).
         # When outputs and inputs are None the entry is metrics-only (no snapshot write).
         self._save_queue: queue.Queue[
             tuple[List[Any] | None, List[Any] | None, str, List[ProcessingMetric]]
             | None
-        ] = queue.Queue()
+        ] = queue.Queue(maxsize=max_pending_batches)
         self._worker_thread = threading.Thread(target=self._save_worker, daemon=True)
-        self._shutdown = False
+        # Set once by shutdown(); enqueueing reads it without taking the lock
+        self._shutdown = threading.Event()
         self._shutdown_lock = threading.Lock()
         self._failed_exception: Optional[Exception] = None
         self._worker_thread.start()
@@ -60,20 +91,24 @@ class BatchStorageWorker:
         Raises:
             RuntimeError: If called after shutdown() has been invoked.
         """
-        with self._shutdown_lock:
-            if self._shutdown:
-                raise RuntimeError(
-                    "Cannot enqueue batch after BatchStorageWorker has been shut down. "
-                    "Items will not be processed."
-                )
+        if self._shutdown.is_set():
+            raise RuntimeError(
+                "Cannot enqueue batch after BatchStorageWorker has been shut down. "
+                "Items will not be processed."
+            )
 
-        logger.debug(
-            "Enqueueing batch of size %d for background saving (batch_id=%s).",
-            len(outputs),
-            batch_id,
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug(
+                "Enqueueing batch of size %d for background saving (batch_id=%s).",
+                len(outputs),
+                batch_id,
+            )
+        self._save_queue.put(
+            (outputs, inputs, batch_id, metrics if metrics is not None else [])
         )
-        self._save_queue.put((outputs, inputs, batch_id, metrics or []))
-        logger.debug("Batch enqueued (batch_id=%s).", batch_id)
+        if debug:
+            logger.debug("Batch enqueued (batch_id=%s).", batch_id)
 
     def enqueue_metrics_only(
         self,
@@ -83,8 +118,8 @@ class BatchStorageWorker:
         """
         Enqueue a metrics-only entry for background saving (no snapshot write).
 
-        This is used to persist failed-item metrics immediately without storing
-        any output or input values.
+        This is used to persist the metrics of a batch in which every item failed,
+        so there are no output or input values to store.
 
         Args:
             metrics: The list of ProcessingMetric instances to save.
@@ -93,27 +128,34 @@ class BatchStorageWorker:
         Raises:
             RuntimeError: If called after shutdown() has been invoked.
         """
-        with self._shutdown_lock:
-            if self._shutdown:
-                raise RuntimeError(
-                    "Cannot enqueue metrics after BatchStorageWorker has been shut down. "
-                    "Metrics will not be saved."
-                )
+        if self._shutdown.is_set():
+            raise RuntimeError(
+                "Cannot enqueue metrics after BatchStorageWorker has been shut down. "
+                "Metrics will not be saved."
+            )
 
-        logger.debug(
-            "Enqueueing %d metric(s) for background saving (batch_id=%s).",
-            len(metrics),
-            batch_id,
-        )
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug(
+                "Enqueueing %d metric(s) for background saving (batch_id=%s).",
+                len(metrics),
+                batch_id,
+            )
         # Use None for outputs and inputs to signal a metrics-only entry
         self._save_queue.put((None, None, batch_id, metrics))
-        logger.debug("Metrics enqueued (batch_id=%s).", batch_id)
+        if debug:
+            logger.debug("Metrics enqueued (batch_id=%s).", batch_id)
 
     def _save_worker(self) -> None:
         """
         Background worker thread that processes the save queue.
         Runs continuously until a sentinel value (None) is received.
 
+        Entries that are already waiting in the queue are merged into one storage
+        write, up to max_coalesce entries or max_coalesce_items items. If the merged
+        write fails, the entries are stored one by one so that a single bad batch
+        does not prevent the others from being saved.
+
         Retries failed storage operations up to max_retries times. If all retries
         fail, stores the exception to be re-raised during shutdown.
         """
@@ -124,59 +166,186 @@ class BatchStorageWorker:
                 self._save_queue.task_done()
                 break
 
-            outputs, inputs, batch_id, metrics = item
-            last_exception = None
-
-            # Retry loop
-            for attempt in range(self.max_retries + 1):
+            entries = [item]
+            merged_items = self._entry_size(item)
+            stop = False
+            while (
+                len(entries) < self.max_coalesce
+                and merged_items < self.max_coalesce_items
+            ):
                 try:
-                    if attempt > 0:
-                        logger.warning(
-                            "Retrying storage operation (attempt %d/%d) for batch (batch_id=%s)",
-                            attempt,
-                            self.max_retries,
-                            batch_id,
-                        )
-                    else:
-                        logger.debug(
-                            "Background thread storing batch (batch_id=%s).",
-                            batch_id,
-                        )
-
-                    # outputs/inputs are None for metrics-only entries
-                    if outputs is not None:
-                        self.storage_backend.store_snapshot(outputs, inputs)
-                    if metrics:
-                        self.storage_backend.store_metrics(metrics)
+                    next_item = self._save_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if next_item is None:
+                    stop = True
+                    break
+                entries.append(next_item)
+                merged_items += self._entry_size(next_item)
+
+            if len(entries) == 1:
+                self._store_entry(*item)
+            elif not self._store_merged(entries):
+                for entry in entries:
+                    self._store_entry(*entry)
+
+            for _ in entries:
+                self._save_queue.task_done()
+            if stop:
+                # Account for the sentinel taken from the queue while merging
+                self._save_queue.task_done()
+                break
+
+    @staticmethod
+    def _entry_size(
+        entry: tuple[List[Any] | None, List[Any] | None, str, List[ProcessingMetric]],
+    ) -> int:
+        """
+        Get the number of items in a queue entry.
+
+        Args:
+            entry: The (outputs, inputs, batch_id, metrics) entry.
+
+        Returns:
+            The number of outputs, or the number of metrics for a metrics-only entry.
+        """
+        outputs, _, _, metrics = entry
+        return len(outputs) if outputs is not None else len(metrics)
+
+    def _store_merged(
+        self,
+        entries: List[
+            tuple[List[Any] | None, List[Any] | None, str, List[ProcessingMetric]]
+        ],
+    ) -> bool:
+        """
+        Store several queue entries with a single attempt at a merged snapshot write.
+
+        Once the merged snapshot is stored, the merged metrics are stored with the
+        usual retries, so a failed metrics write never stores the outputs twice.
+
+        Args:
+            entries: The (outputs, inputs, batch_id, metrics) entries to store.
+
+        Returns:
+            True if the merged snapshot write succeeded, False if the entries must be
+            stored individually.
+        """
+        outputs, inputs, batch_id, metrics = self._merge_entries(entries)
+        if outputs is not None:
+            try:
+                self.storage_backend.store_snapshot(outputs, inputs)
+            except Exception as e:
+                logger.warning(
+                    "Storing merged batches failed (batch_id=%s): %s. "
+                    "Storing them one by one.",
+                    batch_id,
+                    e,
+                )
+                return False
+        if metrics:
+            self._store_entry(None, None, batch_id, metrics)
+        elif logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Background thread stored batch (batch_id=%s).", batch_id)
+        return True
+
+    @staticmethod
+    def _merge_entries(
+        entries: List[
+            tuple[List[Any] | None, List[Any] | None, str, List[ProcessingMetric]]
+        ],
+    ) -> tuple[List[Any] | None, List[Any] | None, str, List[ProcessingMetric]]:
+        """
+        Merge queued entries into a single entry, keeping their order.
+
+        Args:
+            entries: The (outputs, inputs, batch_id, metrics) entries to merge.
+
+        Returns:
+            The merged entry. Outputs and inputs are None if all entries are metrics-only.
+        """
+        outputs: List[Any] | None = None
+        inputs: List[Any] | None = None
+        metrics: List[ProcessingMetric] = []
+        for entry_outputs, entry_inputs, _, entry_metrics in entries:
+            if entry_outputs is not None:
+                if outputs is None:
+                    outputs, inputs = [], []
+                outputs.extend(entry_outputs)
+                inputs.extend(entry_inputs)
+            metrics.extend(entry_metrics)
+        batch_id = "+".join(batch_id for _, _, batch_id, _ in entries)
+        return outputs, inputs, batch_id, metrics
+
+    def _store_entry(
+        self,
+        outputs: List[Any] | None,
+        inputs: List[Any] | None,
+        batch_id: str,
+        metrics: List[ProcessingMetric],
+    ) -> None:
+        """
+        Store one queue entry, retrying up to max_retries times.
+
+        Args:
+            outputs: The outputs to save, or None for a metrics-only entry.
+            inputs: The corresponding inputs, or None for a metrics-only entry.
+            batch_id: Identifier of the entry for tracing in logs.
+            metrics: The ProcessingMetric instances to save.
+        """
+        last_exception = None
+        # Checked once per entry; the debug messages below are skipped when disabled
+        debug = logger.isEnabledFor(logging.DEBUG)
+
+        # Retry loop
+        for attempt in range(self.max_retries + 1):
+            try:
+                if attempt > 0:
+                    logger.warning(
+                        "Retrying storage operation (attempt %d/%d) for batch (batch_id=%s)",
+                        attempt,
+                        self.max_retries,
+                        batch_id,
+                    )
+                elif debug:
+                    logger.debug(
+                        "Background thread storing batch (batch_id=%s).",
+                        batch_id,
+                    )
+
+                # outputs/inputs are None for metrics-only entries
+                if outputs is not None:
+                    self.storage_backend.store_snapshot(outputs, inputs)
+                if metrics:
+                    self.storage_backend.store_metrics(metrics)
+                if debug:
                     logger.debug(
                         "Background thread stored batch (batch_id=%s).", batch_id
                     )
-                    last_exception = None
-                    break  # Success - exit retry loop
-
-                except Exception as e:
-                    last_exception = e
-                    if attempt < self.max_retries:
-                        logger.warning(
-                            "Storage operation failed (attempt %d/%d) (batch_id=%s): %s",
-                            attempt + 1,
-                            self.max_retries + 1,
-                            batch_id,
-                            e,
-                        )
-                    else:
-                        logger.error(
-                            "Storage operation failed after %d attempts (batch_id=%s): %s",
-                            self.max_retries + 1,
-                            batch_id,
-                            e,
-                        )
-
-            # If all retries failed, store the exception to be raised during shutdown
-            if last_exception is not None:
-                self._failed_exception = last_exception
-
-            self._save_queue.task_done()
+                last_exception = None
+                break  # Success - exit retry loop
+
+            except Exception as e:
+                last_exception = e
+                if attempt < self.max_retries:
+                    logger.warning(
+                        "Storage operation failed (attempt %d/%d) (batch_id=%s): %s",
+                        attempt + 1,
+                        self.max_retries + 1,
+                        batch_id,
+                        e,
+                    )
+                else:
+                    logger.error(
+                        "Storage operation failed after %d attempts (batch_id=%s): %s",
+                        self.max_retries + 1,
+                        batch_id,
+                        e,
+                    )
+
+        # If all retries failed, store the exception to be raised during shutdown
+        if last_exception is not None:
+            self._failed_exception = last_exception
 
     def shutdown(self) -> None:
         """
@@ -190,9 +359,9 @@ class BatchStorageWorker:
             Exception: If any storage operation failed after all retries were exhausted.
         """
         with self._shutdown_lock:
-            if self._shutdown:
+            if self._shutdown.is_set():
                 return
-            self._shutdown = True
+            self._shutdown.set()
 
         logger.debug("Shutting down BatchStorageWorker.")
         # Send sentinel value to stop the worker
@@ -3,11 +3,15 @@
 from dataclasses import dataclass
 from datetime import datetime, timezone
 import json
-import statistics
+import math
 from typing import Any
 
+# Exact types whose JSON round-trip returns an equal value. Subclasses such as
+# IntEnum are excluded because they do not round-trip to the same type.
+_JSON_SCALAR_TYPES = frozenset({str, int, float, bool, type(None)})
 
-@dataclass
+
+@dataclass(slots=True)
 class ProcessingMetric:
     """
     Holds timing and result information for a single processed item.
@@ -38,10 +42,15 @@ class ProcessingMetric:
         ``input_item`` is converted with ``repr()`` when it is not natively
         JSON-serialisable so that the serialised format never depends on pickle.
         """
-        try:
-            serialised_input = json.loads(json.dumps(self.input_item))
-        except (TypeError, ValueError):
-            serialised_input = repr(self.input_item)
+        input_item = self.input_item
+        if type(input_item) in _JSON_SCALAR_TYPES:
+            # Scalars serialise to themselves, so skip the JSON round-trip
+            serialised_input = input_item
+        else:
+            try:
+                serialised_input = json.loads(json.dumps(input_item))
+            except (TypeError, ValueError):
+                serialised_input = repr(input_item)
         return {
             "input_item": serialised_input,
             "start_time": self.start_time,
@@ -105,30 +114,56 @@ def generate_metrics_report(metrics: list[ProcessingMetric]) -> dict:
             "failed_items": [],
         }
 
-    durations = [m.duration for m in metrics]
-    avg_duration = sum(durations) / len(durations)
-    min_duration = min(durations)
-    max_duration = max(durations)
-    processing_start = min(m.start_time for m in metrics)
-    processing_end = max(m.end_time for m in metrics)
+    # Collect all aggregates in a single pass. The variance uses Welford's
+    # online algorithm, which stays numerically stable for long runs.
+    durations: list[float] = []
+    failed: list[ProcessingMetric] = []
+    total_duration = 0.0
+    mean = 0.0
+    sum_sq_diff = 0.0
+    min_duration = math.inf
+    max_duration = -math.inf
+    processing_start = math.inf
+    processing_end = -math.inf
+    for m in metrics:
+        start_time = m.start_time
+        end_time = m.end_time
+        duration = end_time - start_time
+        durations.append(duration)
+        total_duration += duration
+        delta = duration - mean
+        mean += delta / len(durations)
+        sum_sq_diff += delta * (duration - mean)
+        if duration < min_duration:
+            min_duration = duration
+        if duration > max_duration:
+            max_duration = duration
+        if start_time < processing_start:
+            processing_start = start_time
+        if end_time > processing_end:
+            processing_end = end_time
+        if not m.success:
+            failed.append(m)
+
+    avg_duration = total_duration / len(durations)
     total_elapsed = processing_end - processing_start
 
-    failed = [m for m in metrics if not m.success]
-
     # Identify outliers using mean ± 2 standard deviations (requires ≥ 2 items)
     slow_outliers: list[dict] = []
     fast_outliers: list[dict] = []
     if len(durations) >= 2:
-        mean = statistics.mean(durations)
-        stdev = statistics.stdev(durations)
-        for m in metrics:
-            if m.duration > mean + 2 * stdev:
+        # Sample standard deviation, as statistics.stdev
+        stdev = math.sqrt(sum_sq_diff / (len(durations) - 1))
+        slow_threshold = mean + 2 * stdev
+        fast_threshold = mean - 2 * stdev
+        for m, duration in zip(metrics, durations):
+            if duration > slow_threshold:
                 slow_outliers.append(
-                    {"input_item": repr(m.input_item), "duration": m.duration}
+                    {"input_item": repr(m.input_item), "duration": duration}
                 )
-            elif m.duration < mean - 2 * stdev:
+            elif duration < fast_threshold:
                 fast_outliers.append(
-                    {"input_item": repr(m.input_item), "duration": m.duration}
+                    {"input_item": repr(m.input_item), "duration": duration}
                 )
 
     return {
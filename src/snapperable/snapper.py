@@ -1,13 +1,16 @@
 from typing import Iterable, Callable, Any, Optional, TypeVar, Generic
 from types import TracebackType
-import threading
+from concurrent.futures import ThreadPoolExecutor
+import itertools
 import time
+import warnings
 
 from snapperable.storage.snapshot_storage import SnapshotStorage
 from snapperable.storage.sqlite_storage import SQLiteSnapshotStorage
 from snapperable.batch_processor import BatchProcessor
 from snapperable.snapshot_tracker import SnapshotTracker
 from snapperable.item_error_handler import FailedItem, ItemErrorHandler
+from snapperable.logger import logger
 from snapperable.processing_metrics import (
     ProcessingMetric,
     generate_json_report,
@@ -16,6 +19,9 @@ from snapperable.processing_metrics import (
 
 T = TypeVar("T")
 
+# Marks a current input for which no stored output has been found
+_MISSING = object()
+
 
 class Snapper(Generic[T]):
     """
@@ -23,14 +29,33 @@ class Snapper(Generic[T]):
     This allows resuming long-running processes without losing progress.
     """
 
-    # Class-level registry to track active storage file paths
-    _active_storages: set[str] = set()
-    _storage_lock = threading.Lock()
+    __slots__ = (
+        "iterable",
+        "fn",
+        "retry_failed_items",
+        "max_workers",
+        "fn_batch",
+        "cache_inputs",
+        "snapshot_storage",
+        "_storage_identifier",
+        "_storage_token",
+        "batch_processor",
+        "_cached_inputs",
+        "_error_handler",
+        # Keep instances weak-referenceable, and let Snapper[T](...) record its
+        # type argument as it does for classes without __slots__
+        "__weakref__",
+        "__orig_class__",
+    )
+
+    # Class-level registry of active storage file paths, mapped to a token owned
+    # by the claiming Snapper. dict.setdefault claims a path atomically.
+    _active_storages: dict[str, object] = {}
 
     def __init__(
         self,
         iterable: Iterable[T],
-        fn: Callable[[T], Any],
+        fn: Callable[[T], Any] | None = None,
         batch_size: int = 1,
         max_wait_time: float | None = None,
         max_retries: int = 3,
@@ -40,13 +65,20 @@ class Snapper(Generic[T]):
         max_consecutive_exceptions: int | None = None,
         skip_item_errors: bool = False,
         retry_failed_items: bool = False,
+        max_workers: int | None = None,
+        fn_batch: Callable[[list[T]], list[Any]] | None = None,
+        cache_inputs: bool = True,
+        max_coalesce: int = 1,
+        max_coalesce_items: int = 4096,
+        max_pending_batches: int = 64,
     ):
         """
         Initialize the Snapper.
 
         Args:
             iterable: The iterable to process.
-            fn: The function to apply to each item in the iterable.
+            fn: The function to apply to each item in the iterable. If None, each item is
+                stored as its own result, which checkpoints the iterable without transforming it.
             snapshot_storage: Optional SnapshotStorage instance. Defaults to SQLite storage.
             batch_processor: Optional BatchProcessor instance. If not provided, a default one is created.
             batch_size: The number of items to batch before saving (used if batch_processor is None).
@@ -70,29 +102,61 @@ class Snapper(Generic[T]):
                 items are skipped so that only new items are processed.
                 Only relevant when skip_item_errors=True and a snapshot from a prior run
                 exists in storage.
+            max_workers: If not None, fn() is applied in a thread pool with this many
+                workers. Items are submitted one batch at a time and their results are
+                recorded in input order, so checkpoints are the same as when processing
+                sequentially. Useful when fn() is I/O-bound; fn() must be thread-safe.
+                When None (the default), items are processed sequentially.
+            fn_batch: Optional function that processes a whole batch of items at once and
+                returns one result per item, in order. When given, it is called once per
+                batch_size items instead of calling fn() per item, e.g. for vectorized
+                functions. If it raises, the items of that batch are processed one by one
+                with fn(), or the exception propagates when fn is None. Each item's
+                metric gets an equal share of the batch duration.
+                Cannot be combined with max_workers.
+            cache_inputs: When True (the default), start() materializes the iterable into a
+                list and keeps it for later load() calls. When False, start() iterates the
+                iterable lazily and keeps nothing in memory, which suits very large
+                iterables. load() then iterates the iterable again, so it must be
+                re-iterable (use load_all() for one-shot iterators).
+            max_coalesce: Maximum number of queued batches merged into a single storage
+                write when saving falls behind (used if batch_processor is None). Default
+                is 1 (no merging).
+            max_coalesce_items: Maximum number of items in a merged storage write (used if
+                batch_processor is None). Default is 4096.
+            max_pending_batches: Maximum number of batches waiting to be saved before
+                processing blocks (used if batch_processor is None). Default is 64; zero
+                or less means unbounded.
 
         Raises:
-            ValueError: If the provided snapshot_storage is already in use by another Snapper instance.
+            ValueError: If the provided snapshot_storage is already in use by another Snapper instance,
+                or if both fn_batch and max_workers are given.
         """
+        if fn_batch is not None and max_workers is not None:
+            raise ValueError("fn_batch and max_workers cannot be used together.")
+
         self.iterable = iterable
         self.fn = fn
         self.retry_failed_items = retry_failed_items
+        self.max_workers = max_workers
+        self.fn_batch = fn_batch
+        self.cache_inputs = cache_inputs
 
         if snapshot_storage is None:
             snapshot_storage = SQLiteSnapshotStorage()
 
         # Check if this storage file path is already in use
         storage_identifier = snapshot_storage.get_storage_identifier()
-        with Snapper._storage_lock:
-            if storage_identifier in Snapper._active_storages:
-                raise ValueError(
-                    "The provided snapshot_storage instance is already in use by another Snapper instance. "
-                    "Each Snapper must have its own snapshot_storage instance to avoid race conditions."
-                )
-            Snapper._active_storages.add(storage_identifier)
+        token = object()
+        if Snapper._active_storages.setdefault(storage_identifier, token) is not token:
+            raise ValueError(
+                "The provided snapshot_storage instance is already in use by another Snapper instance. "
+                "Each Snapper must have its own snapshot_storage instance to avoid race conditions."
+            )
 
         self.snapshot_storage = snapshot_storage
         self._storage_identifier = storage_identifier
+        self._storage_token = token
 
         if batch_processor is None:
             batch_processor = BatchProcessor(
@@ -100,6 +164,9 @@ class Snapper(Generic[T]):
                 batch_size=batch_size,
                 max_wait_time=max_wait_time,
                 max_retries=max_retries,
+                max_coalesce=max_coalesce,
+                max_coalesce_items=max_coalesce_items,
+                max_pending_batches=max_pending_batches,
             )
         self.batch_processor = batch_processor
 
@@ -123,7 +190,8 @@ class Snapper(Generic[T]):
         Start processing the iterable, saving progress to disk.
         Uses input-based tracking to handle dynamic iterables robustly.
 
-        Note: This method caches the materialized iterable to optimize subsequent load() calls.
+        Note: Unless ``cache_inputs=False``, this method caches the materialized iterable to
+        optimize subsequent load() calls.
 
         When ``skip_item_errors=True``, exceptions raised by fn() for individual items are
         caught, recorded in ``self.failed_items``, and the item is skipped so that processing
@@ -139,10 +207,14 @@ class Snapper(Generic[T]):
             # Materialize and cache the iterable for efficient load() calls
             # This is done once during start() to avoid repeated materialization in load()
             # NOTE: This materializes the entire iterable into memory, which could be problematic
-            # for very large or infinite iterables. This defeats lazy evaluation and memory efficiency.
-            # See GitHub issue for potential future improvement to make this configurable.
-            materialized_inputs = list(self.iterable)
-            self._cached_inputs = materialized_inputs
+            # for very large or infinite iterables. Pass cache_inputs=False to process the
+            # iterable lazily instead.
+            inputs: Iterable[T]
+            if self.cache_inputs:
+                inputs = self._cached_inputs = list(self.iterable)
+            else:
+                inputs = self.iterable
+                self._cached_inputs = None
 
             # When retry_failed_items=False (default), load previously-failed inputs from
             # stored metrics so they can be excluded from this run's remaining items.
@@ -156,61 +228,309 @@ class Snapper(Generic[T]):
 
             # Create snapshot tracker to manage processed inputs
             snapshot_tracker = SnapshotTracker(
-                iterable=materialized_inputs,
+                iterable=inputs,
                 snapshot_storage=self.snapshot_storage,
                 additional_processed_inputs=failed_inputs,
             )
 
             # Process remaining items
-            for item in snapshot_tracker.get_remaining():
-                start_time = time.time()
-                try:
-                    # Process the item
-                    result = self.fn(item)
-                except Exception as exc:
-                    end_time = time.time()
-                    # Delegate exception policy to the error handler.
-                    # Returns True → skip this item and continue.
-                    # Returns False → re-raise the original exception.
-                    # May raise RuntimeError if the consecutive threshold is reached.
-                    if self._error_handler.on_item_error(item, exc):
-                        # Persist the failed metric immediately via the background worker
-                        self.batch_processor.add_failed_metric(
-                            ProcessingMetric(
-                                input_item=item,
-                                start_time=start_time,
-                                end_time=end_time,
-                                success=False,
-                                error_message=str(exc),
-                            )
-                        )
-                        continue
-                    raise
+            if self.fn_batch is not None:
+                self._process_in_batches(snapshot_tracker, self.fn_batch)
+            elif self.fn is None:
+                self._process_pass_through(snapshot_tracker)
+            elif self.max_workers is None:
+                # Bind the per-item callables once, outside the loop
+                fn = self.fn
+                now = time.time
+                record_success = self._record_success
+                record_failure = self._record_failure
+                mark_processed = snapshot_tracker.mark_processed
+
+                for item in snapshot_tracker.get_remaining():
+                    start_time = now()
+                    try:
+                        # Process the item
+                        result = fn(item)
+                    except Exception as exc:
+                        if record_failure(item, exc, start_time, now()):
+                            continue
+                        raise
+
+                    record_success(item, result, start_time, now())
+
+                    # Mark as processed
+                    mark_processed(item)
+            else:
+                self._process_concurrently(snapshot_tracker)
+        finally:
+            # Save the remaining items and wait for the background thread to finish
+            # saving, even if there's an exception
+            self.batch_processor.shutdown(flush=True)
+
+    def _process_pass_through(self, snapshot_tracker: SnapshotTracker) -> None:
+        """
+        Store the remaining items as their own results, without calling a function.
 
-                end_time = time.time()
+        Args:
+            snapshot_tracker: The tracker providing the remaining items.
+        """
+        now = time.time
+        record_success = self._record_success
+        mark_processed = snapshot_tracker.mark_processed
+        for item in snapshot_tracker.get_remaining():
+            start_time = now()
+            record_success(item, item, start_time, start_time)
+            mark_processed(item)
+
+    def _process_concurrently(self, snapshot_tracker: SnapshotTracker) -> None:
+        """
+        Apply fn() to the remaining items in a thread pool, one batch at a time.
 
-                # Successful processing – notify handler so it can reset its counters
-                self._error_handler.on_item_success()
+        Results are recorded in input order once the whole batch is done, so
+        checkpoints are the same as in sequential processing. A repeated item is
+        only processed again if its earlier occurrence in the batch failed, and
+        its result is then recorded after the rest of the batch. Unlike
+        sequential processing, fn() has already run for every item of the batch
+        when an exception is raised for one of them; the results of the items
+        after it are discarded.
 
-                metric = ProcessingMetric(
-                    input_item=item,
-                    start_time=start_time,
-                    end_time=end_time,
-                    success=True,
+        Args:
+            snapshot_tracker: The tracker providing the remaining items.
+        """
+        # Submit at least one item per worker, so a small batch size does not
+        # leave workers idle
+        chunk_size = max(self.batch_processor.batch_size, self.max_workers or 1)
+        remaining = snapshot_tracker.get_remaining()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while chunk := list(itertools.islice(remaining, chunk_size)):
+                self._process_chunk(snapshot_tracker, chunk, executor.map)
+
+    def _process_in_batches(
+        self,
+        snapshot_tracker: SnapshotTracker,
+        fn_batch: Callable[[list[T]], list[Any]],
+    ) -> None:
+        """
+        Apply fn_batch() to the remaining items, one batch at a time.
+
+        If fn_batch() raises for a batch, the items of that batch are processed
+        one by one with fn() so that per-item error handling applies. Without fn()
+        there is nothing to fall back to, so the exception is re-raised.
+
+        Args:
+            snapshot_tracker: The tracker providing the remaining items.
+            fn_batch: The function to apply to each batch of items.
+
+        Raises:
+            ValueError: If fn_batch() does not return one result per item.
+        """
+        chunk_size = max(self.batch_processor.batch_size, 1)
+        remaining = snapshot_tracker.get_remaining()
+        while chunk := list(itertools.islice(remaining, chunk_size)):
+            start_time = time.time()
+            try:
+                results = list(fn_batch(chunk))
+            except Exception as exc:
+                if self.fn is None:
+                    raise
+                logger.warning(
+                    "fn_batch failed for %d item(s), processing them one by one: %s",
+                    len(chunk),
+                    exc,
                 )
+                self._process_chunk(snapshot_tracker, chunk, map)
+                continue
+            end_time = time.time()
 
-                # Add to batch processor with input value and metric
-                # The batch processor will store both input and output atomically
-                self.batch_processor.add_item(result, input_value=item, metric=metric)
+            if len(results) != len(chunk):
+                raise ValueError(
+                    f"fn_batch returned {len(results)} results for {len(chunk)} items."
+                )
 
-                # Mark as processed
+            # Spread the batch duration evenly over its items. A repeated item is
+            # only stored once, as in sequential processing.
+            item_duration = (end_time - start_time) / len(chunk)
+            items, outputs, metrics = [], [], []
+            for i, (item, result) in enumerate(zip(chunk, results)):
+                if snapshot_tracker.is_processed(item):
+                    continue
                 snapshot_tracker.mark_processed(item)
+                items.append(item)
+                outputs.append(result)
+                metrics.append(
+                    ProcessingMetric(
+                        input_item=item,
+                        start_time=start_time + i * item_duration,
+                        end_time=start_time + (i + 1) * item_duration,
+                        success=True,
+                    )
+                )
+            self._error_handler.on_item_success()
+            self.batch_processor.add_items(outputs, items, metrics)
 
-            # Ensure all remaining items are saved
-            self.batch_processor.flush()
-        finally:
-            # Wait for background thread to finish saving, even if there's an exception
-            self.batch_processor.shutdown()
+    def _process_chunk(
+        self,
+        snapshot_tracker: SnapshotTracker,
+        chunk: list[T],
+        map_fn: Callable[..., Iterable[tuple[Any, Exception | None, float, float]]],
+    ) -> None:
+        """
+        Apply fn() to a chunk of items with map_fn and record the outcomes in order.
+
+        A repeated item is only processed again if its earlier occurrence failed,
+        as sequential processing would retry it; an item that already succeeded
+        is not passed to fn() again.
+
+        Args:
+            snapshot_tracker: The tracker to mark successful items with.
+            chunk: The items to process.
+            map_fn: map, or the map method of an executor.
+        """
+        pending = chunk
+        while pending:
+            unique, pending = self._split_repeats(pending)
+            self._record_outcomes(
+                snapshot_tracker, unique, map_fn(self._timed_call, unique)
+            )
+            pending = [
+                item for item in pending if not snapshot_tracker.is_processed(item)
+            ]
+
+    @staticmethod
+    def _split_repeats(items: list[T]) -> tuple[list[T], list[T]]:
+        """
+        Split items into their first occurrences and the repeated occurrences.
+
+        Unhashable items cannot be tracked, so they always count as first
+        occurrences.
+
+        Args:
+            items: The items to split.
+
+        Returns:
+            A tuple of the first occurrences and the repeats, both in input order.
+        """
+        unique: list[T] = []
+        repeats: list[T] = []
+        seen: set[Any] = set()
+        for item in items:
+            try:
+                key = SnapshotTracker._make_hashable(item)
+                if key in seen:
+                    repeats.append(item)
+                    continue
+                seen.add(key)
+            except TypeError:
+                pass
+            unique.append(item)
+        return unique, repeats
+
+    def _record_outcomes(
+        self,
+        snapshot_tracker: SnapshotTracker,
+        chunk: list[T],
+        outcomes: Iterable[tuple[Any, Exception | None, float, float]],
+    ) -> None:
+        """
+        Record the outcomes of _timed_call() for a chunk of items, in input order.
+
+        As in sequential processing, an item is marked as processed only when it
+        succeeds, so a failed item is retried when it appears again later in the
+        run.
+
+        Args:
+            snapshot_tracker: The tracker to mark successful items with.
+            chunk: The items that were processed.
+            outcomes: The (result, exception, start_time, end_time) tuple of each item.
+        """
+        for item, (result, exc, start_time, end_time) in zip(chunk, outcomes):
+            if exc is None:
+                self._record_success(item, result, start_time, end_time)
+                snapshot_tracker.mark_processed(item)
+            elif not self._record_failure(item, exc, start_time, end_time):
+                raise exc
+
+    def _timed_call(self, item: T) -> tuple[Any, Exception | None, float, float]:
+        """
+        Apply fn() to an item, capturing its result or exception and timing.
+
+        Args:
+            item: The item to process.
+
+        Returns:
+            A (result, exception, start_time, end_time) tuple.
+        """
+        fn = self.fn
+        start_time = time.time()
+        try:
+            result = item if fn is None else fn(item)
+        except Exception as exc:
+            return None, exc, start_time, time.time()
+        return result, None, start_time, time.time()
+
+    def _record_success(
+        self, item: T, result: Any, start_time: float, end_time: float
+    ) -> None:
+        """
+        Add a successfully processed item and its metric to the batch processor.
+
+        Args:
+            item: The input item.
+            result: The output of fn() for the item.
+            start_time: Unix timestamp when processing started.
+            end_time: Unix timestamp when processing finished.
+        """
+        # Successful processing – notify handler so it can reset its counters
+        self._error_handler.on_item_success()
+
+        metric = ProcessingMetric(
+            input_item=item,
+            start_time=start_time,
+            end_time=end_time,
+            success=True,
+        )
+
+        # Add to batch processor with input value and metric
+        # The batch processor will store both input and output atomically
+        self.batch_processor.add_item(result, input_value=item, metric=metric)
+
+    def _record_failure(
+        self, item: T, exc: Exception, start_time: float, end_time: float
+    ) -> bool:
+        """
+        Apply the exception policy to a failed item.
+
+        Args:
+            item: The input item.
+            exc: The exception raised by fn() for the item.
+            start_time: Unix timestamp when processing started.
+            end_time: Unix timestamp when processing failed.
+
+        Returns:
+            True if the item is skipped and processing continues, False if the
+            exception must be re-raised.
+
+        Raises:
+            RuntimeError: If the consecutive exception threshold is reached.
+        """
+        # Delegate exception policy to the error handler.
+        # Returns True → skip this item and continue.
+        # Returns False → re-raise the original exception.
+        # May raise RuntimeError if the consecutive threshold is reached.
+        if not self._error_handler.on_item_error(item, exc):
+            return False
+
+        # Persist the failed metric with the next batch flush
+        self.batch_processor.add_failed_metric(
+            ProcessingMetric(
+                input_item=item,
+                start_time=start_time,
+                end_time=end_time,
+                success=False,
+                error_message=str(exc),
+            )
+        )
+        return True
 
     def load(self) -> list[T]:
         """
@@ -219,8 +539,9 @@ class Snapper(Generic[T]):
 
         Performance notes:
         - If load() is called after start(), it uses cached inputs (fast, no materialization).
-        - If load() is called after program restart or interruption, the iterable must be
-          materialized to compare with stored inputs (slower, unavoidable).
+        - If load() is called after program restart or interruption, the iterable is
+          compared with the stored inputs item by item. It is only materialized into a
+          new list from the first mismatch on.
         - For large iterables where input matching is not needed, consider using load_all().
 
         Returns:
@@ -232,18 +553,17 @@ class Snapper(Generic[T]):
         if not stored_inputs:
             return self.snapshot_storage.load_snapshot()
 
-        # Use cached inputs if available (after start()), otherwise materialize
+        # Use cached inputs if available (after start()), otherwise stream the
+        # iterable against the stored inputs
         if self._cached_inputs is not None:
             current_inputs = self._cached_inputs
+            if self._inputs_match(current_inputs, stored_inputs):
+                return self.snapshot_storage.load_snapshot()
         else:
-            # Materialize the iterable to compare with stored inputs
-            # This is necessary after program restart or interruption to determine
-            # which outputs match the current input sequence
-            current_inputs = list(self.iterable)
-
-        # If inputs match, return the outputs
-        if self._inputs_match(current_inputs, stored_inputs):
-            return self.snapshot_storage.load_snapshot()
+            mismatched_inputs = self._compare_with_stored(stored_inputs)
+            if mismatched_inputs is None:
+                return self.snapshot_storage.load_snapshot()
+            current_inputs = mismatched_inputs
 
         # Otherwise, return outputs for matching inputs only
         return self._get_matching_outputs(current_inputs, stored_inputs)
@@ -303,14 +623,33 @@ class Snapper(Generic[T]):
         Returns:
             True if inputs match, False otherwise.
         """
-        if len(current_inputs) != len(stored_inputs):
-            return False
+        # List equality checks the lengths and compares the elements in C,
+        # stopping at the first mismatch
+        return current_inputs == stored_inputs
+
+    def _compare_with_stored(self, stored_inputs: list[Any]) -> list[Any] | None:
+        """
+        Compare the iterable with stored inputs without materializing a matching prefix.
 
-        for current, stored in zip(current_inputs, stored_inputs):
-            if current != stored:
-                return False
+        Items that equal the stored inputs are not kept; the prefix is taken from
+        stored_inputs once a mismatch is found.
 
-        return True
+        Args:
+            stored_inputs: Stored input values.
+
+        Returns:
+            None if the iterable equals the stored inputs, otherwise the current inputs.
+        """
+        iterator = iter(self.iterable)
+        count = 0
+        for current in iterator:
+            if count >= len(stored_inputs) or current != stored_inputs[count]:
+                return stored_inputs[:count] + [current] + list(iterator)
+            count += 1
+        if count < len(stored_inputs):
+            # The iterable is a strict prefix of the stored inputs
+            return stored_inputs[:count]
+        return None
 
     def _get_matching_outputs(
         self, current_inputs: list[Any], stored_inputs: list[Any]
@@ -326,58 +665,70 @@ class Snapper(Generic[T]):
             List of outputs for matching inputs.
         """
         all_outputs = self.snapshot_storage.load_all_outputs()
+        make_hashable = SnapshotTracker._make_hashable
+
+        # Only outputs for the current inputs are kept, so the mapping stays small
+        # when the stored inputs extend well beyond the current ones. Unhashable
+        # current inputs get the _MISSING key, which never receives an output.
+        try:
+            current_keys = [make_hashable(inp) for inp in current_inputs]
+            wanted = dict.fromkeys(current_keys, _MISSING)
+        except TypeError:
+            current_keys = []
+            wanted = {_MISSING: _MISSING}
+            for inp in current_inputs:
+                try:
+                    key = make_hashable(inp)
+                    wanted.setdefault(key, _MISSING)
+                except TypeError:
+                    # If not hashable, skip
+                    key = _MISSING
+                current_keys.append(key)
 
-        # Create a mapping from stored inputs to outputs
         # NOTE: If there are duplicate inputs in storage (which shouldn't happen
         # with correct implementation, but could with external storage manipulation),
         # only the last output for each duplicate input will be kept.
-        input_to_output = {}
-        seen_inputs = set()
+        duplicates = 0
         for inp, out in zip(stored_inputs, all_outputs):
             try:
-                hashable_inp = SnapshotTracker._make_hashable(inp)
-                if hashable_inp in seen_inputs:
-                    import warnings
-
-                    warnings.warn(
-                        f"Duplicate input detected in storage: {inp}. "
-                        "Only the last output will be used.",
-                        UserWarning,
-                        stacklevel=2,
-                    )
-                seen_inputs.add(hashable_inp)
-                input_to_output[hashable_inp] = out
+                key = make_hashable(inp)
+                if key in wanted:
+                    if wanted[key] is not _MISSING:
+                        duplicates += 1
+                    wanted[key] = out
             except TypeError:
                 # If not hashable, skip
                 pass
 
-        # Get outputs for current inputs
-        matching_outputs = []
-        for inp in current_inputs:
-            try:
-                hashable_inp = SnapshotTracker._make_hashable(inp)
-                if hashable_inp in input_to_output:
-                    matching_outputs.append(input_to_output[hashable_inp])
-            except TypeError:
-                # If not hashable, skip
-                pass
+        if duplicates:
+            warnings.warn(
+                f"{duplicates} duplicate input(s) detected in storage. "
+                "Only the last output of each will be used.",
+                UserWarning,
+                stacklevel=3,
+            )
 
-        return matching_outputs
+        return [
+            out for out in map(wanted.__getitem__, current_keys) if out is not _MISSING
+        ]
 
     def _release_storage(self) -> None:
         """
         Release the storage instance from the active registry.
         This allows the storage to be reused by another Snapper instance.
         """
-        with Snapper._storage_lock:
-            Snapper._active_storages.discard(self._storage_identifier)
+        # Only release the path while this instance still owns it; after an exit
+        # another Snapper may have claimed it
+        identifier = self._storage_identifier
+        if Snapper._active_storages.get(identifier) is self._storage_token:
+            Snapper._active_storages.pop(identifier, None)
 
     def __del__(self):
         """
         Cleanup when the Snapper instance is destroyed.
         """
         # Only release if initialization completed successfully
-        if hasattr(self, "_storage_identifier"):
+        if getattr(self, "_storage_identifier", None) is not None:
             self._release_storage()
 
     def __enter__(self):
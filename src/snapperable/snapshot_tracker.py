@@ -1,11 +1,21 @@
 """Tracks which inputs have been processed and determines remaining items."""
 
 from typing import Iterable, Any, TypeVar
+import itertools
 
 from snapperable.storage.snapshot_storage import SnapshotStorage
 
 T = TypeVar("T")
 
+# Hashable types that _make_hashable returns unchanged. Checked with type() so
+# subclasses and tuples (which may contain lists) still take the slow path.
+_HASHABLE_SCALAR_TYPES = frozenset(
+    {int, float, complex, bool, str, bytes, frozenset, type(None)}
+)
+
+# Key of an item that has no hashable representation
+_UNHASHABLE = object()
+
 
 class SnapshotTracker:
     """
@@ -36,7 +46,12 @@ class SnapshotTracker:
         self.snapshot_storage = snapshot_storage
         self._additional_processed_inputs: list[Any] = additional_processed_inputs or []
         self._processed_inputs_set: set[Any] = set()
+        self._resume_offset = 0
         self._initialized = False
+        # The item last yielded by get_remaining() and its hashable key, so that
+        # mark_processed() does not convert the same item a second time
+        self._last_item: Any = _UNHASHABLE
+        self._last_key: Any = _UNHASHABLE
 
     @staticmethod
     def _make_hashable(obj: Any) -> Any:
@@ -49,6 +64,8 @@ class SnapshotTracker:
         Returns:
             A hashable representation of the object.
         """
+        if type(obj) in _HASHABLE_SCALAR_TYPES:
+            return obj
         if isinstance(obj, (list, tuple)):
             return tuple(SnapshotTracker._make_hashable(item) for item in obj)
         elif isinstance(obj, dict):
@@ -71,12 +88,18 @@ class SnapshotTracker:
         stored_inputs = self.snapshot_storage.load_inputs()
 
         # Create a hashable representation of stored inputs
+        all_hashable = True
         for inp in stored_inputs:
             try:
                 self._processed_inputs_set.add(SnapshotTracker._make_hashable(inp))
             except TypeError:
                 # If input is not hashable, we'll process it again
-                pass
+                all_hashable = False
+
+        # Unhashable inputs must be processed again, so the prefix can only be
+        # skipped when every stored input is tracked as processed
+        if all_hashable:
+            self._resume_offset = self._stored_prefix_length(stored_inputs)
 
         # Also skip any additional inputs provided at construction time
         for inp in self._additional_processed_inputs:
@@ -87,6 +110,35 @@ class SnapshotTracker:
 
         self._initialized = True
 
+    def _stored_prefix_length(self, stored_inputs: list[Any]) -> int:
+        """
+        Get the number of leading items of the iterable that equal the stored inputs.
+
+        When resuming an interrupted run, the iterable usually starts with exactly
+        the inputs that were already processed. That prefix can then be skipped in
+        one step instead of hashing and looking up every item.
+
+        Args:
+            stored_inputs: The previously stored input values.
+
+        Returns:
+            len(stored_inputs) if the iterable starts with the stored inputs, else 0.
+        """
+        if not stored_inputs or not isinstance(self.iterable, (list, tuple)):
+            return 0
+
+        prefix = self.iterable[: len(stored_inputs)]
+        if isinstance(prefix, tuple):
+            prefix = list(prefix)
+        try:
+            if prefix == stored_inputs:
+                return len(stored_inputs)
+        except (TypeError, ValueError):
+            # Items without a plain boolean equality (e.g. arrays) fall back to
+            # the per-item check
+            pass
+        return 0
+
     def get_remaining(self) -> Iterable[T]:
         """
         Get the remaining items from the iterable that haven't been processed yet.
@@ -96,18 +148,43 @@ class SnapshotTracker:
         """
         self._initialize()
 
-        for item in self.iterable:
+        processed = self._processed_inputs_set
+        make_hashable = SnapshotTracker._make_hashable
+        # Skip the already-processed prefix without per-item checks
+        for item in itertools.islice(self.iterable, self._resume_offset, None):
             # Check if this input was already processed
             try:
-                hashable_item = SnapshotTracker._make_hashable(item)
-                if hashable_item in self._processed_inputs_set:
+                hashable_item = (
+                    item
+                    if type(item) in _HASHABLE_SCALAR_TYPES
+                    else make_hashable(item)
+                )
+                if hashable_item in processed:
                     continue
             except TypeError:
                 # If item is not hashable, process it
-                pass
+                hashable_item = _UNHASHABLE
 
+            self._last_item = item
+            self._last_key = hashable_item
             yield item
 
+    def is_processed(self, item: T) -> bool:
+        """
+        Check whether an item has been marked as processed.
+
+        Args:
+            item: The item to check.
+
+        Returns:
+            True if the item is tracked as processed, False otherwise. Unhashable
+            items cannot be tracked and are never reported as processed.
+        """
+        try:
+            return SnapshotTracker._make_hashable(item) in self._processed_inputs_set
+        except TypeError:
+            return False
+
     def mark_processed(self, item: T) -> None:
         """
         Mark an item as processed.
@@ -115,6 +192,12 @@ class SnapshotTracker:
         Args:
             item: The item that has been processed.
         """
+        if item is self._last_item:
+            hashable_item = self._last_key
+            if hashable_item is not _UNHASHABLE:
+                self._processed_inputs_set.add(hashable_item)
+            return
+
         try:
             hashable_item = SnapshotTracker._make_hashable(item)
             self._processed_inputs_set.add(hashable_item)
@@ -1,8 +1,10 @@
 """Pickle-based snapshot storage backend."""
 
+import mmap
 import pickle
 import os
-from typing import TypeVar, Any
+import struct
+from typing import BinaryIO, TypeVar, Any
 
 from snapperable.storage.snapshot_storage import SnapshotStorage
 from snapperable.logger import logger
@@ -10,6 +12,27 @@ from snapperable.processing_metrics import ProcessingMetric
 
 T = TypeVar("T")
 
+# A log file starts with this marker, followed by frames that each hold an 8-byte
+# little-endian payload length and a pickled record dict. Files without the
+# marker are in the older format: a single pickled dict of all data.
+_LOG_MAGIC = b"SNAPLOG1"
+_FRAME_HEADER = struct.Struct("<Q")
+
+
+def _write_frame(f: BinaryIO, payload: bytes) -> None:
+    """
+    Write one log frame.
+
+    The header and payload are written separately rather than concatenated, so a
+    large payload, e.g. one holding arrays or bytes, is not copied once more.
+
+    Args:
+        f: The binary file to write to.
+        payload: The pickled record.
+    """
+    f.write(_FRAME_HEADER.pack(len(payload)))
+    f.write(payload)
+
 
 class PickleSnapshotStorage(SnapshotStorage[T]):
     def __init__(self, file_path: str = "snapper_checkpoint.pkl"):
@@ -20,6 +43,10 @@ class PickleSnapshotStorage(SnapshotStorage[T]):
             file_path: Path to the pickle file.
         """
         self.file_path = file_path
+        # Size of the file after this instance last wrote it; reads do not update
+        # it. Appending to a file of any other size first checks it for an
+        # incomplete last record.
+        self._valid_size = -1
 
     def get_storage_identifier(self) -> str:
         """
@@ -30,26 +57,14 @@ class PickleSnapshotStorage(SnapshotStorage[T]):
 
     def store_snapshot(self, processed: list[T], inputs: list[Any]) -> None:
         """
-        Save processed results and corresponding inputs atomically.
-        This method ensures that existing processed items and inputs are loaded and appended before saving.
+        Append processed results and corresponding inputs to the file.
+        Both are written in a single record, so they are always loaded together.
 
         Args:
             processed: The list of processed items to save.
             inputs: The list of input values corresponding to the processed items.
         """
-        # Load existing data
-        data = self._load_data()
-        existing_processed = data.get("processed", [])
-        existing_inputs = data.get("inputs", [])
-
-        # Append new data
-        combined_processed = existing_processed + processed
-        combined_inputs = existing_inputs + inputs
-
-        # Save the combined data atomically
-        data["processed"] = combined_processed
-        data["inputs"] = combined_inputs
-        self._save_data(data)
+        self._append_record({"processed": processed, "inputs": inputs})
 
     def load_snapshot(self) -> list[T]:
         """
@@ -81,7 +96,7 @@ class PickleSnapshotStorage(SnapshotStorage[T]):
 
     def store_metrics(self, metrics: list[ProcessingMetric]) -> None:
         """
-        Save per-item processing metrics, appending to any existing metrics.
+        Save per-item processing metrics by appending them to the file.
 
         Metrics are stored as JSON-compatible dicts so that the format remains
         readable even if the ProcessingMetric class changes in the future.
@@ -89,10 +104,7 @@ class PickleSnapshotStorage(SnapshotStorage[T]):
         Args:
             metrics: The list of ProcessingMetric instances to save.
         """
-        data = self._load_data()
-        existing_metrics = data.get("metrics", [])
-        data["metrics"] = existing_metrics + [m.to_dict() for m in metrics]
-        self._save_data(data)
+        self._append_record({"metrics": [m.to_dict() for m in metrics]})
 
     def load_metrics(self) -> list[ProcessingMetric]:
         """
@@ -115,16 +127,104 @@ class PickleSnapshotStorage(SnapshotStorage[T]):
         Returns:
             A dictionary containing all stored data.
         """
+        data, _ = self._read_file()
+        return data
+
+    def _read_file(self) -> tuple[dict, int]:
+        """
+        Read all data from the pickle file, in either the log or the older format.
+
+        Returns:
+            A tuple of the stored data and the number of leading bytes that form a
+            valid log. The size is -1 if the file is missing, corrupted or in the
+            older format, in which case it must be rewritten before appending.
+        """
         try:
             with open(self.file_path, "rb") as f:
-                return pickle.load(f)
-        except (FileNotFoundError, pickle.UnpicklingError, EOFError):
+                # Unpickle from a memory map of the whole file rather than through
+                # many small reads on the file object
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    if mm[: len(_LOG_MAGIC)] == _LOG_MAGIC:
+                        # Records are unpickled from slices of a view of the map,
+                        # which do not copy the record bytes
+                        with memoryview(mm) as view:
+                            return self._read_frames(view)
+                    return pickle.loads(mm), -1
+        except (FileNotFoundError, pickle.UnpicklingError, EOFError, ValueError):
+            # ValueError: an empty file cannot be memory-mapped
             logger.warning(f"Pickle file '{self.file_path}' is corrupted or missing.")
-            return {}
+            return {}, -1
+
+    def _read_frames(self, view: memoryview) -> tuple[dict, int]:
+        """
+        Read and merge the records of a log file.
+
+        A record that cannot be unpickled is skipped. An incomplete record at the
+        end of the file, e.g. from a crash during a write, is ignored.
+
+        Args:
+            view: Memory view of the whole file.
+
+        Returns:
+            A tuple of the merged data and the offset where the valid log ends.
+        """
+        data: dict = {}
+        size = len(view)
+        offset = len(_LOG_MAGIC)
+        while offset + _FRAME_HEADER.size <= size:
+            (length,) = _FRAME_HEADER.unpack_from(view, offset)
+            start = offset + _FRAME_HEADER.size
+            end = start + length
+            if end > size:
+                break
+            try:
+                record = pickle.loads(view[start:end])
+            except (pickle.UnpicklingError, EOFError, ValueError):
+                logger.warning("Corrupted record in pickle file skipped.")
+            else:
+                for key, values in record.items():
+                    data.setdefault(key, []).extend(values)
+            offset = end
+
+        if offset < size:
+            logger.warning(
+                f"Ignoring incomplete record at the end of pickle file '{self.file_path}'."
+            )
+        return data, offset
+
+    def _append_record(self, record: dict) -> None:
+        """
+        Append a record to the log file, so a save only writes the new data.
+
+        A file in the older format or a corrupted file is first rewritten as a log
+        of the data that could be read from it, and an incomplete last record is
+        cut off.
+
+        Args:
+            record: A dictionary mapping keys to lists of values to append.
+        """
+        payload = pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+        try:
+            size = os.path.getsize(self.file_path)
+        except FileNotFoundError:
+            size = -1
+
+        if size == -1:
+            self._save_data({})
+        elif size != self._valid_size:
+            data, valid_size = self._read_file()
+            if valid_size == -1:
+                self._save_data(data)
+            elif valid_size < size:
+                os.truncate(self.file_path, valid_size)
+
+        with open(self.file_path, "ab") as f:
+            _write_frame(f, payload)
+            self._valid_size = f.tell()
 
     def _save_data(self, data: dict) -> None:
         """
-        Save all data to the pickle file atomically.
+        Save all data to the pickle file atomically, as a log of a single record.
 
         Uses a temporary file and atomic rename to ensure data is not corrupted
         if the process crashes during the write operation.
@@ -135,7 +235,11 @@ class PickleSnapshotStorage(SnapshotStorage[T]):
         # Write to a temporary file first
         temp_path = str(self.file_path) + ".tmp"
         with open(temp_path, "wb") as f:
-            pickle.dump(data, f)
+            f.write(_LOG_MAGIC)
+            if data:
+                payload = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+                _write_frame(f, payload)
+            self._valid_size = f.tell()
 
         # Atomically replace the original file
         # os.replace() is atomic on both Unix and Windows
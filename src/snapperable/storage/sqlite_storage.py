@@ -1,11 +1,12 @@
 """SQLite-based snapshot storage backend."""
 
+from contextlib import contextmanager
 from pathlib import Path
 import sqlite3
 import pickle
 import json
 import os
-from typing import TypeVar, Any
+from typing import Iterator, TypeVar, Any
 
 from snapperable.storage.snapshot_storage import SnapshotStorage
 from snapperable.logger import logger
@@ -13,6 +14,12 @@ from snapperable.processing_metrics import ProcessingMetric
 
 T = TypeVar("T")
 
+# Upper bound on how much of the database file SQLite may memory-map
+_MMAP_SIZE = 1 << 30
+
+# Newest pickle protocol: faster and more compact than the default protocol
+_PICKLE_PROTOCOL = pickle.HIGHEST_PROTOCOL
+
 
 class SQLiteSnapshotStorage(SnapshotStorage[T]):
     def __init__(self, db_path: Path | str = "snapper_checkpoint.db"):
@@ -23,6 +30,7 @@ class SQLiteSnapshotStorage(SnapshotStorage[T]):
             db_path: Path to the SQLite database file.
         """
         self.db_path = str(db_path)  # Normalize to string
+        self._initialized = False
 
     def get_storage_identifier(self) -> str:
         """
@@ -32,9 +40,20 @@ class SQLiteSnapshotStorage(SnapshotStorage[T]):
         return os.path.abspath(self.db_path)
 
     def _initialize_database(self) -> None:
-        """Create tables if they do not exist."""
+        """
+        Create tables if they do not exist.
+
+        The schema only needs to be created once per storage instance, so later
+        calls return immediately unless the database file has been removed.
+        """
+        if self._initialized and os.path.exists(self.db_path):
+            return
         Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
+            # WAL lets each batch commit append to the log instead of rewriting
+            # the rollback journal, and keeps readers from blocking the writer.
+            # The journal mode is persistent, so it only needs setting once.
+            conn.execute("PRAGMA journal_mode=WAL")
             cursor = conn.cursor()
             cursor.execute(
                 """
@@ -60,7 +79,29 @@ class SQLiteSnapshotStorage(SnapshotStorage[T]):
                 )
                 """
             )
-            conn.commit()
+        self._initialized = True
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """
+        Open a connection for a single transaction.
+
+        The transaction is committed when the block exits normally and rolled back
+        on an exception; the connection is always closed afterwards.
+        """
+        conn = sqlite3.connect(self.db_path)
+        try:
+            # In WAL mode NORMAL only syncs at checkpoints, which is still safe
+            # against application crashes and avoids an fsync per batch commit.
+            conn.execute("PRAGMA synchronous=NORMAL")
+            # Keep temporary b-trees in memory and read the database through a
+            # memory map instead of copying pages into the page cache.
+            conn.execute("PRAGMA temp_store=MEMORY")
+            conn.execute(f"PRAGMA mmap_size={_MMAP_SIZE}")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
 
     def _reset_database(self):
         """
@@ -68,8 +109,10 @@ class SQLiteSnapshotStorage(SnapshotStorage[T]):
         This is used when the database file is corrupted.
         """
         logger.warning("Database file is corrupted. Resetting the database.")
-        if os.path.exists(self.db_path):
-            os.remove(self.db_path)
+        for path in (self.db_path, self.db_path + "-wal", self.db_path + "-shm"):
+            if os.path.exists(path):
+                os.remove(path)
+        self._initialized = False
         self._initialize_database()
 
     def store_snapshot(self, processed: list[T], inputs: list[Any]) -> None:
@@ -81,21 +124,20 @@ class SQLiteSnapshotStorage(SnapshotStorage[T]):
             inputs: The list of input values corresponding to the processed items.
         """
         self._initialize_database()
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
 
-            # Serialize and append processed results
-            serialized_outputs = [(pickle.dumps(item),) for item in processed]
+            # Serialize and append processed results. Rows are pickled as
+            # executemany consumes them, without building a list first.
             cursor.executemany(
                 "INSERT INTO processed_outputs (result) VALUES (?)",
-                serialized_outputs,
+                ((pickle.dumps(item, _PICKLE_PROTOCOL),) for item in processed),
             )
 
             # Serialize and append inputs
-            serialized_inputs = [(pickle.dumps(item),) for item in inputs]
             cursor.executemany(
                 "INSERT INTO inputs (input_value) VALUES (?)",
-                serialized_inputs,
+                ((pickle.dumps(item, _PICKLE_PROTOCOL),) for item in inputs),
             )
 
             logger.debug("Stored batch of %d items to SQLite database.", len(processed))
@@ -110,11 +152,11 @@ class SQLiteSnapshotStorage(SnapshotStorage[T]):
         processed_items: list[T] = []
         try:
             self._initialize_database()
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
-                cursor.execute("SELECT result FROM processed_outputs")
-                rows = cursor.fetchall()
-                for row in rows:
+                # Decode rows as they are fetched instead of holding every
+                # serialized row in memory next to the decoded values
+                for row in cursor.execute("SELECT result FROM processed_outputs"):
                     try:
                         processed_items.append(pickle.loads(row[0]))
                     except (pickle.UnpicklingError, EOFError):
@@ -136,11 +178,9 @@ class SQLiteSnapshotStorage(SnapshotStorage[T]):
         inputs: list[Any] = []
         try:
             self._initialize_database()
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
-                cursor.execute("SELECT input_value FROM inputs ORDER BY id")
-                rows = cursor.fetchall()
-                for row in rows:
+                for row in cursor.execute("SELECT input_value FROM inputs ORDER BY id"):
                     try:
                         inputs.append(pickle.loads(row[0]))
                     except (pickle.UnpicklingError, EOFError):
@@ -167,12 +207,11 @@ class SQLiteSnapshotStorage(SnapshotStorage[T]):
             metrics: The list of ProcessingMetric instances to save.
         """
         self._initialize_database()
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
-            serialized = [(json.dumps(m.to_dict()),) for m in metrics]
             cursor.executemany(
                 "INSERT INTO processing_metrics (metric) VALUES (?)",
-                serialized,
+                ((json.dumps(m.to_dict()),) for m in metrics),
             )
             logger.debug("Stored %d metric(s) to SQLite database.", len(metrics))
 
@@ -185,11 +224,11 @@ class SQLiteSnapshotStorage(SnapshotStorage[T]):
         result: list[ProcessingMetric] = []
         try:
             self._initialize_database()
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
-                cursor.execute("SELECT metric FROM processing_metrics ORDER BY id")
-                rows = cursor.fetchall()
-                for row in rows:
+                for row in cursor.execute(
+                    "SELECT metric FROM processing_metrics ORDER BY id"
+                ):
                     try:
                         result.append(ProcessingMetric.from_dict(json.loads(row[0])))
                     except (json.JSONDecodeError, KeyError, TypeError):
@@ -1,8 +1,15 @@
+import gc
+import subprocess
+import sys
+import threading
 import time
+import weakref
 import pytest
 from unittest.mock import MagicMock
+from snapperable import batch_processor
 from snapperable.batch_processor import BatchProcessor
 from snapperable.batch_storage_worker import BatchStorageWorker
+from snapperable.processing_metrics import ProcessingMetric
 from snapperable.snapper import Snapper
 from snapperable.storage.pickle_storage import PickleSnapshotStorage
 from pathlib import Path
@@ -284,3 +291,199 @@ def test_enqueue_after_shutdown_raises_error():
         match="Cannot enqueue batch after BatchStorageWorker has been shut down",
     ):
         worker.enqueue_batch(["output1"], ["input1"])
+
+
+def test_queued_batches_are_coalesced():
+    """
+    Test that batches waiting in the queue are merged into a single write
+    when max_coalesce allows it.
+    """
+    mock_storage = MagicMock()
+    first_save_started = threading.Event()
+    release_first_save = threading.Event()
+    saved = []
+
+    def store_snapshot(outputs, inputs):
+        first_save_started.set()
+        release_first_save.wait(timeout=5)
+        saved.append(list(outputs))
+
+    mock_storage.store_snapshot.side_effect = store_snapshot
+
+    worker = BatchStorageWorker(mock_storage, max_coalesce=10)
+    worker.enqueue_batch(["a"], ["1"], "1")
+    assert first_save_started.wait(timeout=5)
+
+    # These batches queue up while the first save is blocked
+    worker.enqueue_batch(["b"], ["2"], "2")
+    worker.enqueue_batch(["c"], ["3"], "3")
+    worker.enqueue_metrics_only([MagicMock()], "4")
+    release_first_save.set()
+    worker.shutdown()
+
+    assert saved == [["a"], ["b", "c"]]
+    assert mock_storage.store_metrics.call_count == 1
+
+
+def test_enqueue_blocks_when_queue_is_full():
+    """
+    Test that enqueueing blocks while max_pending_batches entries are waiting.
+    """
+    mock_storage = MagicMock()
+    release_save = threading.Event()
+    mock_storage.store_snapshot.side_effect = lambda outputs, inputs: release_save.wait(
+        timeout=5
+    )
+
+    worker = BatchStorageWorker(mock_storage, max_pending_batches=1)
+    worker.enqueue_batch(["a"], ["1"], "1")  # Taken by the worker, which blocks
+    worker.enqueue_batch(["b"], ["2"], "2")  # Fills the queue
+
+    third_enqueued = threading.Event()
+
+    def enqueue_third():
+        worker.enqueue_batch(["c"], ["3"], "3")
+        third_enqueued.set()
+
+    producer = threading.Thread(target=enqueue_third)
+    producer.start()
+    assert not third_enqueued.wait(timeout=0.2)
+
+    release_save.set()
+    producer.join(timeout=5)
+    assert third_enqueued.is_set()
+    worker.shutdown()
+    assert mock_storage.store_snapshot.call_count == 3
+
+
+def test_partial_batch_saved_at_interpreter_exit(tmp_path: Path):
+    """
+    Test that a partial batch is saved when the process exits without shutdown().
+    """
+    storage_path = tmp_path / "atexit.pkl"
+    script = (
+        "from snapperable.batch_processor import BatchProcessor\n"
+        "from snapperable.storage.pickle_storage import PickleSnapshotStorage\n"
+        f"storage = PickleSnapshotStorage({str(storage_path)!r})\n"
+        "processor = BatchProcessor(storage_backend=storage, batch_size=10)\n"
+        "for i in range(3):\n"
+        "    processor.add_item(i * 2, input_value=i)\n"
+    )
+    subprocess.run([sys.executable, "-c", script], check=True, timeout=30)
+
+    storage = PickleSnapshotStorage(str(storage_path))
+    assert storage.load_snapshot() == [0, 2, 4]
+    assert storage.load_inputs() == [0, 1, 2]
+
+
+def test_collected_processor_is_not_kept_for_exit():
+    """
+    Test that a processor garbage-collected without shutdown() is no longer
+    tracked for the exit hook.
+    """
+    gc.collect()
+    live_before = len(batch_processor._live_processors)
+    processor = BatchProcessor(storage_backend=MagicMock(), batch_size=10)
+    processor_ref = weakref.ref(processor)
+    assert len(batch_processor._live_processors) == live_before + 1
+
+    del processor
+    gc.collect()
+
+    assert processor_ref() is None
+    assert len(batch_processor._live_processors) == live_before
+
+
+def test_failed_coalesced_write_falls_back_to_single_batches():
+    """
+    Test that a failing merged write is retried batch by batch, so only the
+    bad batch is lost.
+    """
+    mock_storage = MagicMock()
+    first_save_started = threading.Event()
+    release_first_save = threading.Event()
+    saved = []
+
+    def store_snapshot(outputs, inputs):
+        first_save_started.set()
+        release_first_save.wait(timeout=5)
+        if "bad" in outputs:
+            raise IOError("bad batch")
+        saved.append(list(outputs))
+
+    mock_storage.store_snapshot.side_effect = store_snapshot
+
+    worker = BatchStorageWorker(mock_storage, max_retries=1, max_coalesce=10)
+    worker.enqueue_batch(["a"], ["1"], "1")
+    assert first_save_started.wait(timeout=5)
+
+    worker.enqueue_batch(["b"], ["2"], "2")
+    worker.enqueue_batch(["bad"], ["3"], "3")
+    worker.enqueue_batch(["d"], ["4"], "4")
+    release_first_save.set()
+
+    with pytest.raises(IOError, match="bad batch"):
+        worker.shutdown()
+    assert saved == [["a"], ["b"], ["d"]]
+
+
+def test_failed_coalesced_metrics_write_does_not_store_outputs_twice():
+    """
+    Test that when only the metrics of a merged write fail, just the metrics are
+    retried and the merged outputs are not stored again batch by batch.
+    """
+    mock_storage = MagicMock()
+    first_save_started = threading.Event()
+    release_first_save = threading.Event()
+    saved = []
+    metric_calls = []
+
+    def store_snapshot(outputs, inputs):
+        first_save_started.set()
+        release_first_save.wait(timeout=5)
+        saved.append(list(outputs))
+
+    def store_metrics(metrics):
+        metric_calls.append(list(metrics))
+        if len(metric_calls) == 2:
+            raise IOError("metrics write failed")
+
+    mock_storage.store_snapshot.side_effect = store_snapshot
+    mock_storage.store_metrics.side_effect = store_metrics
+    metrics = [
+        ProcessingMetric(input_item=i, start_time=0.0, end_time=1.0, success=True)
+        for i in range(3)
+    ]
+
+    worker = BatchStorageWorker(mock_storage, max_retries=1, max_coalesce=10)
+    worker.enqueue_batch(["a"], ["1"], "1", [metrics[0]])
+    assert first_save_started.wait(timeout=5)
+
+    worker.enqueue_batch(["b"], ["2"], "2", [metrics[1]])
+    worker.enqueue_batch(["c"], ["3"], "3", [metrics[2]])
+    release_first_save.set()
+    worker.shutdown()
+
+    assert saved == [["a"], ["b", "c"]]
+    assert metric_calls == [[metrics[0]], metrics[1:], metrics[1:]]
+
+
+def test_snapper_passes_coalescing_options_to_batch_processor(tmp_path):
+    """
+    Test that the coalescing and queue options of Snapper reach the storage worker.
+    """
+    storage = PickleSnapshotStorage(str(tmp_path / "coalesce.pkl"))
+    with Snapper(
+        range(3),
+        lambda x: x,
+        snapshot_storage=storage,
+        max_coalesce=8,
+        max_coalesce_items=100,
+        max_pending_batches=4,
+    ) as snapper:
+        worker = snapper.batch_processor._storage_worker
+        assert worker.max_coalesce == 8
+        assert worker.max_coalesce_items == 100
+        assert worker._save_queue.maxsize == 4
+        snapper.start()
+        assert snapper.load() == [0, 1, 2]
@@ -1,7 +1,9 @@
 import pytest
 from unittest.mock import MagicMock
 from snapperable.batch_processor import BatchProcessor
+from snapperable.processing_metrics import ProcessingMetric
 import time
+import weakref
 
 
 @pytest.fixture
@@ -125,3 +127,91 @@ def test_wait_time_not_exceeded():
     processor.shutdown()
     # Should have flushed once
     assert mock_storage.store_snapshot.call_count == 1
+
+
+def test_failed_metrics_saved_with_batch(batch_processor, mock_snapshot_storage):
+    """
+    Test that failed-item metrics count towards the batch size and are saved
+    together with the batch instead of with a separate write per failure.
+    """
+    failed = ProcessingMetric(
+        input_item="input2", start_time=0.0, end_time=1.0, success=False
+    )
+    batch_processor.add_item("item1", input_value="input1")
+    batch_processor.add_failed_metric(failed)
+    mock_snapshot_storage.store_metrics.assert_not_called()
+
+    batch_processor.add_item("item3", input_value="input3")
+    batch_processor.shutdown()
+
+    mock_snapshot_storage.store_snapshot.assert_called_once_with(
+        ["item1", "item3"], ["input1", "input3"]
+    )
+    mock_snapshot_storage.store_metrics.assert_called_once_with([failed])
+
+
+def test_wait_time_counts_from_first_item_in_batch():
+    """
+    Test that an idle period between batches does not flush the next item immediately.
+    """
+    mock_storage = MagicMock()
+    processor = BatchProcessor(
+        storage_backend=mock_storage, batch_size=10, max_wait_time=0.2
+    )
+    processor.add_item("item1", input_value="input1")
+    processor.flush()
+    time.sleep(0.3)
+
+    processor.add_item("item2", input_value="input2")  # Starts a new wait period
+    assert len(processor.current_batch) == 1
+
+    processor.shutdown()
+    assert mock_storage.store_snapshot.call_count == 1
+
+
+def test_add_items_flushes_full_batches(batch_processor, mock_snapshot_storage):
+    """
+    Test that add_items flushes each full batch and keeps the remainder.
+    """
+    batch_processor.add_item("item0", input_value="input0")
+    batch_processor.add_items(
+        [f"item{i}" for i in range(1, 8)], [f"input{i}" for i in range(1, 8)]
+    )
+    assert batch_processor.current_batch == [
+        ("input6", "item6"),
+        ("input7", "item7"),
+    ]
+
+    batch_processor.shutdown()
+    assert mock_snapshot_storage.store_snapshot.call_args_list == [
+        ((["item0", "item1", "item2"], ["input0", "input1", "input2"]),),
+        ((["item3", "item4", "item5"], ["input3", "input4", "input5"]),),
+    ]
+
+
+def test_add_items_rejects_mismatched_lengths(batch_processor):
+    """
+    Test that add_items raises ValueError when items and inputs differ in length.
+    """
+    with pytest.raises(ValueError, match="same length"):
+        batch_processor.add_items(["item1", "item2"], ["input1"])
+
+
+def test_flush_releases_batch_items(batch_processor, mock_snapshot_storage):
+    """
+    Test that the processor does not keep references to a flushed batch.
+    """
+
+    class Output:
+        pass
+
+    output = Output()
+    output_ref = weakref.ref(output)
+    batch_processor.add_item(output, input_value="input1")
+    batch_processor.flush()
+    batch_processor.shutdown()
+    # The mock keeps the arguments it was called with
+    mock_snapshot_storage.reset_mock()
+    del output
+
+    assert output_ref() is None
@@ -3,6 +3,8 @@
 import os
 from pathlib import Path
 
+import pytest
+
 from snapperable.snapper import Snapper
 from snapperable.storage.pickle_storage import PickleSnapshotStorage
 from snapperable.storage.sqlite_storage import SQLiteSnapshotStorage
@@ -249,3 +251,35 @@ def test_snapper_preserves_order_of_outputs(tmp_path: Path):
 
     # Should return outputs in the new input order, with new items processed
     assert result == [2, 6, 10, 16, 18, 4, 8]
+
+
+def test_load_warns_once_for_duplicate_stored_inputs(tmp_path: Path):
+    """
+    Test that duplicate inputs in storage produce a single warning and the
+    last output of each duplicate is used.
+    """
+    storage = PickleSnapshotStorage[int](os.path.join(tmp_path, "dupes.pkl"))
+    storage.store_snapshot([10, 20, 11, 21], [1, 2, 1, 2])
+
+    with Snapper([2, 1, 3], lambda item: item * 10, snapshot_storage=storage) as snapper:
+        with pytest.warns(UserWarning, match="2 duplicate input") as record:
+            result = snapper.load()
+
+    assert len(record) == 1
+    assert result == [21, 11]
+
+
+def test_load_streams_generator_against_stored_inputs(tmp_path: Path):
+    """
+    Test that load() compares a fresh generator with the stored inputs, both
+    when it matches exactly and when it diverges or is shorter.
+    """
+    storage = PickleSnapshotStorage[int](os.path.join(tmp_path, "stream.pkl"))
+    storage.store_snapshot([0, 2, 4, 6], [0, 1, 2, 3])
+
+    with Snapper((i for i in range(4)), lambda i: i * 2, snapshot_storage=storage) as s:
+        assert s.load() == [0, 2, 4, 6]
+    with Snapper((i for i in [0, 1, 5, 3]), lambda i: i * 2, snapshot_storage=storage) as s:
+        assert s.load() == [0, 2, 6]
+    with Snapper((i for i in range(2)), lambda i: i * 2, snapshot_storage=storage) as s:
+        assert s.load() == [0, 2]
@@ -107,6 +107,20 @@ def test_processing_metric_to_dict_non_json_input_item_uses_repr():
     json.dumps(d)
 
 
+def test_processing_metric_to_dict_scalar_subclass_is_serialised_as_json():
+    import enum
+
+    class Color(enum.IntEnum):
+        RED = 1
+
+    metric = ProcessingMetric(
+        input_item=Color.RED, start_time=0.0, end_time=1.0, success=True
+    )
+    d = metric.to_dict()
+    assert d["input_item"] == 1
+    assert type(d["input_item"]) is int
+
+
 def test_processing_metric_from_dict_ignores_unknown_keys():
     data = {
         "input_item": 1,
@@ -411,11 +425,11 @@ def test_metrics_accumulate_across_runs(tmp_path):
 
 
 # ---------------------------------------------------------------------------
-# Failed metrics stored immediately (not delayed until after shutdown)
+# Failed metrics stored with their batch (not delayed until after shutdown)
 # ---------------------------------------------------------------------------
 
 
-def test_failed_metrics_stored_immediately(tmp_path):
+def test_failed_metrics_stored_with_each_batch(tmp_path):
     """Failed metrics must be stored through the background worker, not delayed."""
     fail_on = {1, 3}
     stored_counts = []
@@ -437,8 +451,8 @@ def test_failed_metrics_stored_immediately(tmp_path):
     )
     snapper.start()
 
-    # store_metrics should have been called multiple times (once per failure + once per success batch)
-    # rather than a single call after shutdown
+    # With batch_size=1 every item, failed or not, is its own batch, so
+    # store_metrics is called once per item rather than once after shutdown
     assert len(stored_counts) >= 2
     # Each call should only contain the metrics that were ready at that time
     assert all(c >= 1 for c in stored_counts)
@@ -448,6 +462,39 @@ def test_failed_metrics_stored_immediately(tmp_path):
     assert len(metrics) == 5
 
 
+def test_failed_metrics_count_towards_batch_size(tmp_path):
+    """Failed metrics are saved with the batch they belong to, in processing order."""
+    fail_on = {1, 3}
+    stored_counts = []
+
+    class TrackingStorage(SQLiteSnapshotStorage):
+        def store_metrics(self, metrics):
+            super().store_metrics(metrics)
+            stored_counts.append(len(metrics))
+
+    storage = TrackingStorage(str(tmp_path / "test.db"))
+
+    def process(x):
+        if x in fail_on:
+            raise ItemError(f"bad {x}")
+        return x * 2
+
+    snapper = Snapper(
+        range(6),
+        process,
+        snapshot_storage=storage,
+        skip_item_errors=True,
+        batch_size=3,
+    )
+    snapper.start()
+
+    # Two batches of three items each, failures included
+    assert stored_counts == [3, 3]
+    metrics = storage.load_metrics()
+    assert [m.input_item for m in metrics] == [0, 1, 2, 3, 4, 5]
+    assert [m.success for m in metrics] == [True, False, True, False, True, True]
+
+
 # ---------------------------------------------------------------------------
 # retry_failed_items=False (default) – skip previously failed items
 # ---------------------------------------------------------------------------
@@ -1,4 +1,5 @@
 import os
+import weakref
 import pytest
 from pathlib import Path
 
@@ -167,6 +168,41 @@ def test_snapper_prevents_different_storage_instances_same_file_pickle(tmp_path:
         _snapper2 = Snapper(iterable, process_item, snapshot_storage=storage2)
 
 
+def test_exited_snapper_does_not_release_path_claimed_by_another(tmp_path: Path):
+    """
+    Test that destroying a Snapper after its exit does not release the storage
+    path that another Snapper has claimed in the meantime.
+    """
+    snapshot_storage_path = str(tmp_path / "shared.pkl")
+
+    with Snapper(
+        range(3), snapshot_storage=PickleSnapshotStorage[int](snapshot_storage_path)
+    ) as snapper_a:
+        pass
+
+    snapper_b = Snapper(
+        range(3), snapshot_storage=PickleSnapshotStorage[int](snapshot_storage_path)
+    )
+    del snapper_a
+
+    with pytest.raises(ValueError, match="already in use by another Snapper instance"):
+        Snapper(
+            range(3), snapshot_storage=PickleSnapshotStorage[int](snapshot_storage_path)
+        )
+    snapper_b.batch_processor.shutdown()
+
+
+def test_snapper_supports_weakrefs_and_generic_alias(tmp_path: Path):
+    """
+    Test that Snapper instances can be weakly referenced and keep the type
+    argument they were created with.
+    """
+    storage = PickleSnapshotStorage[int](str(tmp_path / "weakref.pkl"))
+    with Snapper[int](range(3), snapshot_storage=storage) as snapper:
+        assert weakref.ref(snapper)() is snapper
+        assert snapper.__orig_class__ == Snapper[int]
+
+
 def test_snapper_prevents_mixed_storage_types_same_file(tmp_path: Path):
     """
     Test that Snapper prevents different storage types (Pickle and SQLite)
@@ -191,3 +227,201 @@ def test_snapper_prevents_mixed_storage_types_same_file(tmp_path: Path):
     # should raise ValueError
     with pytest.raises(ValueError, match="already in use by another Snapper instance"):
         _snapper2 = Snapper(iterable, process_item, snapshot_storage=storage2)
+
+
+def test_snapper_with_max_workers_keeps_input_order(tmp_path: Path):
+    """
+    Test that processing with a thread pool stores results in input order
+    and processes duplicate inputs only once.
+    """
+    data = [3, 1, 2, 2, 5, 4, 1, 6]
+    processed: list[int] = []
+
+    def process_item(item: int) -> int:
+        processed.append(item)
+        return item * 2
+
+    storage = PickleSnapshotStorage[int](str(tmp_path / "workers.pkl"))
+    with Snapper(
+        data, process_item, batch_size=3, max_workers=4, snapshot_storage=storage
+    ) as snapper:
+        snapper.start()
+        result = snapper.load()
+
+    assert result == [item * 2 for item in data]
+    assert sorted(processed) == sorted(set(data))
+
+
+def test_snapper_with_max_workers_retries_repeated_failed_item(tmp_path: Path):
+    """
+    Test that a failed item is processed again when it appears again in the same
+    run, as in sequential processing.
+    """
+    processed: list[int] = []
+
+    def process_item(item: int) -> int:
+        processed.append(item)
+        if item == 1 and processed.count(1) == 1:
+            raise ValueError("first attempt fails")
+        return item * 2
+
+    storage = PickleSnapshotStorage[int](str(tmp_path / "workers.pkl"))
+    with Snapper(
+        [1, 2, 1],
+        process_item,
+        batch_size=3,
+        max_workers=2,
+        skip_item_errors=True,
+        snapshot_storage=storage,
+    ) as snapper:
+        snapper.start()
+        result = snapper.load()
+
+    assert sorted(processed) == [1, 1, 2]
+    assert len(snapper.failed_items) == 1
+    assert result == [2, 4, 2]
+
+
+def test_snapper_with_fn_batch(tmp_path: Path):
+    """
+    Test that fn_batch is called once per batch and its results are stored in order.
+    """
+    batches: list[list[int]] = []
+
+    def process_batch(items: list[int]) -> list[int]:
+        batches.append(items)
+        return [item * 2 for item in items]
+
+    storage = PickleSnapshotStorage[int](str(tmp_path / "fn_batch.pkl"))
+    with Snapper(
+        range(7),
+        lambda item: item * 2,
+        batch_size=3,
+        fn_batch=process_batch,
+        snapshot_storage=storage,
+    ) as snapper:
+        snapper.start()
+        result = snapper.load()
+
+    assert batches == [[0, 1, 2], [3, 4, 5], [6]]
+    assert result == [item * 2 for item in range(7)]
+    assert len(snapper.load_metrics()) == 7
+
+
+def test_snapper_fn_batch_failure_falls_back_to_fn(tmp_path: Path):
+    """
+    Test that items of a batch are processed one by one when fn_batch raises.
+    """
+    processed: list[int] = []
+
+    def process_item(item: int) -> int:
+        processed.append(item)
+        return item * 2
+
+    def process_batch(items: list[int]) -> list[int]:
+        if 4 in items:
+            raise ValueError("batch failed")
+        return [item * 2 for item in items]
+
+    storage = PickleSnapshotStorage[int](str(tmp_path / "fn_batch_fallback.pkl"))
+    with Snapper(
+        range(6),
+        process_item,
+        batch_size=3,
+        fn_batch=process_batch,
+        snapshot_storage=storage,
+    ) as snapper:
+        snapper.start()
+        result = snapper.load()
+
+    assert processed == [3, 4, 5]
+    assert result == [item * 2 for item in range(6)]
+
+
+def test_snapper_fn_batch_fallback_skips_repeated_items(tmp_path: Path):
+    """
+    Test that the per-item fallback after a failing fn_batch does not call fn
+    again for a repeat of an item that already succeeded, as in sequential mode.
+    """
+    processed: list[int] = []
+
+    def process_batch(items: list[int]) -> list[int]:
+        raise ValueError("batch failed")
+
+    def process_item(item: int) -> int:
+        processed.append(item)
+        return item * 2
+
+    storage = PickleSnapshotStorage[int](str(tmp_path / "batch.pkl"))
+    with Snapper(
+        [1, 1, 2],
+        process_item,
+        fn_batch=process_batch,
+        batch_size=3,
+        snapshot_storage=storage,
+    ) as snapper:
+        snapper.start()
+        result = snapper.load()
+
+    assert processed == [1, 2]
+    assert result == [2, 2, 4]
+
+
+def test_snapper_fn_batch_failure_without_fn_raises(tmp_path: Path):
+    """
+    Test that a failing fn_batch is re-raised when there is no fn to fall back to,
+    instead of storing the inputs as results.
+    """
+
+    def process_batch(items: list[int]) -> list[int]:
+        raise ValueError("batch failed")
+
+    storage = PickleSnapshotStorage[int](str(tmp_path / "batch.pkl"))
+    with Snapper(
+        range(4), fn_batch=process_batch, batch_size=2, snapshot_storage=storage
+    ) as snapper:
+        with pytest.raises(ValueError, match="batch failed"):
+            snapper.start()
+        assert snapper.load() == []
+
+
+def test_snapper_without_fn_stores_items(tmp_path: Path):
+    """
+    Test that a Snapper without fn checkpoints the items themselves.
+    """
+    storage = PickleSnapshotStorage[int](str(tmp_path / "identity.pkl"))
+    with Snapper(range(5), batch_size=2, snapshot_storage=storage) as snapper:
+        snapper.start()
+        assert snapper.load() == [0, 1, 2, 3, 4]
+
+
+def test_snapper_saves_partial_batch_on_exception(tmp_path: Path):
+    """
+    Test that items processed before an exception are saved even when their
+    batch was not full yet.
+    """
+
+    def process(item: int) -> int:
+        if item == 3:
+            raise SimulatedInterrupt()
+        return item * 2
+
+    storage = PickleSnapshotStorage[int](str(tmp_path / "partial.pkl"))
+    with Snapper(range(10), process, batch_size=10, snapshot_storage=storage) as snapper:
+        with pytest.raises(SimulatedInterrupt):
+            snapper.start()
+
+    assert storage.load_snapshot() == [0, 2, 4]
+
+
+def test_snapper_without_input_cache_processes_lazily(tmp_path: Path):
+    """
+    Test that cache_inputs=False processes the iterable without keeping it in memory.
+    """
+    storage = PickleSnapshotStorage[int](str(tmp_path / "lazy.pkl"))
+    with Snapper(
+        range(6), lambda item: item * 2, snapshot_storage=storage, cache_inputs=False
+    ) as snapper:
+        snapper.start()
+        assert snapper._cached_inputs is None
+        assert snapper.load() == [0, 2, 4, 6, 8, 10]
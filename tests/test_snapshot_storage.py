@@ -1,4 +1,6 @@
 import os
+import pickle
+import sqlite3
 import pytest
 from snapperable.storage.pickle_storage import PickleSnapshotStorage
 from snapperable.storage.sqlite_storage import SQLiteSnapshotStorage
@@ -70,6 +72,44 @@ class TestPickleSnapshotStorage:
         # Assert
         assert loaded_data == []
 
+    def test_load_snapshot_with_empty_file(self, storage: PickleSnapshotStorage):
+        # Arrange
+        open(storage.file_path, "wb").close()
+
+        # Act
+        loaded_data = storage.load_snapshot()
+
+        # Assert
+        assert loaded_data == []
+
+    def test_load_snapshot_from_single_dict_file(self, storage: PickleSnapshotStorage):
+        # Arrange: a file in the older format holding one pickled dict
+        with open(storage.file_path, "wb") as f:
+            pickle.dump({"processed": ["a"], "inputs": [1]}, f)
+
+        # Act
+        storage.store_snapshot(["b"], [2])
+
+        # Assert
+        assert storage.load_snapshot() == ["a", "b"]
+        assert storage.load_inputs() == [1, 2]
+
+    def test_incomplete_last_record_is_ignored(self, storage: PickleSnapshotStorage):
+        # Arrange: simulate a crash halfway through writing the second record
+        storage.store_snapshot(["a"], [1])
+        size = os.path.getsize(storage.file_path)
+        storage.store_snapshot(["b"], [2])
+        os.truncate(storage.file_path, size + 5)
+
+        # Act
+        loaded_before_append = storage.load_snapshot()
+        storage.store_snapshot(["c"], [3])
+
+        # Assert
+        assert loaded_before_append == ["a"]
+        assert storage.load_snapshot() == ["a", "c"]
+        assert storage.load_inputs() == [1, 3]
+
 
 class TestSQLiteSnapshotStorage:
     @pytest.fixture
@@ -124,6 +164,15 @@ class TestSQLiteSnapshotStorage:
         # Assert
         assert os.path.exists(storage.db_path)
 
+    def test_database_uses_wal_journal(self, storage: SQLiteSnapshotStorage):
+        # Act
+        storage.store_snapshot([{"key": "value"}], ["input1"])
+
+        # Assert
+        with sqlite3.connect(storage.db_path) as conn:
+            journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        assert journal_mode == "wal"
+
     def test_load_snapshot_with_corrupted_db(self, storage: SQLiteSnapshotStorage):
         # Arrange
         with open(storage.db_path, "wb") as f:
@@ -245,3 +245,63 @@ class TestSnapshotTracker:
 
         remaining = list(tracker.get_remaining())
         assert remaining == [3, 4]
+
+    def test_resumed_prefix_is_skipped_without_per_item_checks(self, monkeypatch):
+        """Test that a stored prefix of the iterable is skipped in one step."""
+        mock_storage = MagicMock()
+        # List inputs, since scalars bypass _make_hashable
+        mock_storage.load_inputs.return_value = [[1], [2], [3]]
+
+        calls = []
+        make_hashable = SnapshotTracker._make_hashable
+
+        def counting_make_hashable(obj):
+            # Only count top-level calls, not the recursion into list elements
+            if isinstance(obj, list):
+                calls.append(obj)
+            return make_hashable(obj)
+
+        monkeypatch.setattr(
+            SnapshotTracker, "_make_hashable", staticmethod(counting_make_hashable)
+        )
+
+        tracker = SnapshotTracker([[1], [2], [3], [4], [2]], mock_storage)
+        remaining = list(tracker.get_remaining())
+
+        assert remaining == [[4]]
+        # Stored inputs are hashed once; of the iterable only 4 and 2 are checked
+        assert calls == [[1], [2], [3], [4], [2]]
+
+    def test_make_hashable_returns_scalars_unchanged(self):
+        """Test that hashable scalars are returned as-is and tuples still recurse."""
+        key = frozenset({1, 2})
+        assert SnapshotTracker._make_hashable(key) is key
+        assert SnapshotTracker._make_hashable("abc") == "abc"
+        assert SnapshotTracker._make_hashable((1, [2, 3])) == (1, (2, 3))
+
+    def test_mark_processed_reuses_key_of_yielded_item(self, monkeypatch):
+        """Test that marking the item just yielded does not convert it again."""
+        mock_storage = MagicMock()
+        mock_storage.load_inputs.return_value = []
+
+        calls = []
+        make_hashable = SnapshotTracker._make_hashable
+
+        def counting_make_hashable(obj):
+            if isinstance(obj, dict):
+                calls.append(obj)
+            return make_hashable(obj)
+
+        monkeypatch.setattr(
+            SnapshotTracker, "_make_hashable", staticmethod(counting_make_hashable)
+        )
+
+        items = [{"a": 1}, {"a": 2}, {"a": 1}]
+        tracker = SnapshotTracker(items, mock_storage)
+        remaining = []
+        for item in tracker.get_remaining():
+            remaining.append(item)
+            tracker.mark_processed(item)
+
+        assert remaining == [{"a": 1}, {"a": 2}]
+        assert calls == items